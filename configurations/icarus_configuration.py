@@ -31,6 +31,7 @@ CONFIG = {
         "secs": [17],  # list(range(0, 130))
         "millis": [0],
         "epoch": ["2020/01/01 00:00:00"],
+        "propagator": ["ephem"],
     },
     "grid": {"strat": [GeodesicGridStrat], "repeats": [22]},
     "gweight": {"strat": [GDPWeightStrat], "dataset_file": [None]},
@@ -40,6 +41,7 @@ CONFIG = {
         "desirability_stretch": [2],
         "k": [5],
         "esx_theta": [0.5],
+        "search": ["dijkstra"],
     },
     "edges": {"strat": [BidirEdgeStrat]},
     "bw_sel": {"strat": [SampledBwSelectStrat], "sampled_quanta": [250000]},
@@ -100,6 +102,7 @@ def generate_default_dict(
     lsn_secs=17,
     lsn_millis=0,
     lsn_epoch="2020/01/01 00:00:00",
+    lsn_propagator="ephem",
     grid_strat=GeodesicGridStrat,
     grid_repeats=22,
     gweight_strat=GDPWeightStrat,
@@ -110,6 +113,7 @@ def generate_default_dict(
     rout_desirability_stretch=1.5,
     rout_k=3,
     rout_esx_theta=0.5,
+    rout_search="dijkstra",
     edges_strat=BidirEdgeStrat,
     bw_sel_strat=SampledBwSelectStrat,
     bw_sel_sampled_quanta=250000,
@@ -158,6 +162,7 @@ def generate_default_dict(
             "secs": [lsn_secs],
             "millis": [lsn_millis],
             "epoch": [lsn_epoch],
+            "propagator": [lsn_propagator],
         },
         "grid": {"strat": [grid_strat], "repeats": [grid_repeats]},
         "gweight": {"strat": [gweight_strat], "dataset_file": [gweight_dataset_file]},
@@ -167,6 +172,7 @@ def generate_default_dict(
             "desirability_stretch": [rout_desirability_stretch],
             "k": [rout_k],
             "esx_theta": [rout_esx_theta],
+            "search": [rout_search],
         },
         "edges": {"strat": [edges_strat]},
         "bw_sel": {"strat": [bw_sel_strat], "sampled_quanta": [bw_sel_sampled_quanta]},
@@ -0,0 +1,67 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Benchmark of the routing search methods on the standard configuration of configurations/icarus_configuration.py.
+The constellation, grid and coverage are computed as in the first configured run. Then the same random sample of
+grid pairs is routed with every search method, timing it and checking that all methods find the same path lengths.
+Run from the repository root: PYTHONPATH=. python development_tools/benchmark_routing_search.py [num_pairs]
+"""
+import math
+import random
+import sys
+import time
+
+from configurations.icarus_configuration import CONFIG, parse_config, get_strat
+from icarus_simulator.sat_core.routing_graph import SEARCH_METHODS
+from icarus_simulator.strategies.routing import SSPRoutStrat, KDGRoutStrat
+
+NUM_PAIRS = 2000
+SEED = 42
+
+
+def prepare_inputs(conf):
+    sat_pos, network, _ = get_strat("lsn", conf).compute()
+    grid = get_strat("grid", conf).compute()
+    coverage = get_strat("cover", conf).compute(grid, sat_pos)
+    for gnd in [gnd for gnd in coverage if len(coverage[gnd]) == 0]:
+        del coverage[gnd]
+        del grid[gnd]
+    return grid, network, coverage
+
+
+def run_benchmark(num_pairs: int):
+    conf = parse_config(CONFIG)[0]
+    rout_conf = {key: val for key, val in conf["rout"].items() if key not in ("strat", "search")}
+    grid, network, coverage = prepare_inputs(conf)
+    grid_ids = list(grid.keys())
+    random.seed(SEED)
+    pairs = set()
+    while len(pairs) < num_pairs:
+        src, dst = random.sample(grid_ids, 2)
+        pairs.add((min(src, dst), max(src, dst)))
+    pairs = sorted(pairs)
+    print(f"{len(grid_ids)} grid points, {network.number_of_nodes()} satellites, {len(pairs)} pairs")
+
+    for strat_class in (SSPRoutStrat, KDGRoutStrat):
+        reference, ref_time = None, None
+        for method in SEARCH_METHODS:
+            strat = strat_class(search=method, **rout_conf)
+            start = time.time()
+            result = [strat.compute(pair, grid, network, coverage) for pair in pairs]
+            elapsed = time.time() - start
+            lengths = [[length for _, length in lbset] for lbset in result]
+            if reference is None:
+                reference, ref_time = lengths, elapsed
+            mismatches = sum(
+                1
+                for ref, lns in zip(reference, lengths)
+                if len(ref) != len(lns)
+                or not all(math.isclose(a, b, rel_tol=1e-9) for a, b in zip(ref, lns))
+            )
+            print(
+                f"{strat.description:<24} {method:<9} {elapsed:8.2f}s  "
+                f"speedup {ref_time / elapsed:5.2f}x  mismatches {mismatches}"
+            )
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_PAIRS)
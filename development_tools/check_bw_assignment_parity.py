@@ -0,0 +1,150 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Regression check of the block-wise greedy bandwidth assignment against the sequential per-quantum greedy.
+The random cases use a fixed seed. The sequential greedy allocates the quanta one at a time, in order. A quantum fits
+if every link of its path can take one more, and then loads each link once per traversal. The check runs
+greedy_block_split, on demands, and greedy_block_assign, on single quanta, with several block sizes. They must
+allocate exactly the same quanta, so the allocated and dropped counts must be identical. Paths crossing the same link
+more than once are included.
+The same comparison then runs end to end through BidirBwAssignStrat.compute, on a small synthetic constellation, with
+the original per-path loop as reference. The check also verifies that compute leaves path_data unchanged.
+Run from the repository root: PYTHONPATH=. python development_tools/check_bw_assignment_parity.py
+"""
+import copy
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from icarus_simulator.bw_table import greedy_block_assign, greedy_block_split
+from icarus_simulator.strategies.bw_assignment import BidirBwAssignStrat
+from icarus_simulator.structure_definitions import BwInfo, EdgeInfo, PathData, PathId
+from icarus_simulator.utils import get_edges
+
+SEED = 42
+NUM_CASES = 400
+BLOCK_SIZES = (1, 2, 7, 64, 4096)
+
+
+def sequential_greedy(
+    paths: List[List[int]], amounts: List[int], load: np.ndarray, limit: np.ndarray
+) -> List[int]:
+    """Reference: allocate the quanta of each demand one at a time, in order. Returns the allocated amounts."""
+    load = load.copy()
+    allocated = []
+    for links, amount in zip(paths, amounts):
+        granted = 0
+        for _ in range(amount):
+            if any(load[link] + 1 > limit[link] for link in links):
+                break  # Loads only grow: the following quanta of the demand do not fit either
+            for link in links:
+                load[link] += 1
+            granted += 1
+        allocated.append(granted)
+    return allocated
+
+
+def random_case(rng: random.Random) -> Tuple[List[List[int]], List[int], np.ndarray, np.ndarray]:
+    num_links = rng.randint(1, 12)
+    num_demands = rng.randint(1, 60)
+    paths = []
+    for _ in range(num_demands):
+        links = [rng.randrange(num_links) for _ in range(rng.randint(1, 6))]
+        if rng.random() < 0.3:
+            links.append(rng.choice(links))  # Cross a link twice
+        paths.append(links)
+    amounts = [rng.choice([0, 1, 1, 2, 3, rng.randint(1, 40)]) for _ in range(num_demands)]
+    limit = np.array([rng.randint(0, 60) for _ in range(num_links)], dtype=np.int64)
+    load = np.array([rng.randint(0, int(lim) + 1) for lim in limit], dtype=np.int64)
+    return paths, amounts, load, limit
+
+
+def flatten(paths: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    hop_items = np.repeat(np.arange(len(paths)), [len(links) for links in paths])
+    hop_links = np.array([link for links in paths for link in links], dtype=np.int64)
+    return hop_items, hop_links
+
+
+def check_random_cases() -> None:
+    rng = random.Random(SEED)
+    for case in range(NUM_CASES):
+        paths, amounts, load, limit = random_case(rng)
+        expected = sequential_greedy(paths, amounts, load, limit)
+        hop_demands, hop_links = flatten(paths)
+        # The same quanta one by one, consecutive for each demand
+        quantum_paths = [links for links, amount in zip(paths, amounts) for _ in range(amount)]
+        expected_quanta = sequential_greedy(quantum_paths, [1] * len(quantum_paths), load, limit)
+        hop_quanta, quantum_links = flatten(quantum_paths)
+        for block_size in BLOCK_SIZES:
+            split = greedy_block_split(
+                hop_demands, hop_links, np.array(amounts, dtype=np.int64), load.copy(), limit, block_size
+            )
+            assert split.tolist() == expected, f"Case {case}, block {block_size}: split {split} != {expected}"
+            assigned = greedy_block_assign(
+                hop_quanta, quantum_links, len(quantum_paths), load.copy(), limit, block_size
+            )
+            assert assigned.astype(int).tolist() == expected_quanta, f"Case {case}, block {block_size}: quanta differ"
+    print(f"{NUM_CASES} random cases, block sizes {BLOCK_SIZES}: identical allocations")
+
+
+def synthetic_routing(rng: random.Random) -> Tuple[PathData, Dict, List[PathId]]:
+    """Paths on a ring of satellites, gnd-sat-gnd paths included, and a sampled list of quanta."""
+    num_sats, num_gnds = 12, 20
+    edge_data = {}
+    for sat in range(num_sats):
+        nxt = (sat + 1) % num_sats
+        for ed in ((sat, nxt), (nxt, sat), (-1, sat), (sat, -1)):
+            edge_data[ed] = EdgeInfo([])
+    path_data = {}
+    for src in range(num_gnds):
+        for dst in range(src + 1, num_gnds):
+            lbset = []
+            for _ in range(rng.randint(1, 3)):
+                start, hops = rng.randrange(num_sats), rng.randint(0, 4)
+                step = rng.choice([1, -1])
+                sats = [(start + step * i) % num_sats for i in range(hops + 1)]
+                lbset.append(([-src] + sats + [-dst], float(hops)))
+            path_data[(src, dst)] = lbset
+    pairs = list(path_data.keys())
+    path_list = []
+    for _ in range(3000):
+        pair = rng.choice(pairs)
+        path_list.append((pair[0], pair[1], rng.randrange(len(path_data[pair]))))
+    return path_data, edge_data, path_list
+
+
+def original_assign(
+    path_data: PathData, path_list: List[PathId], edge_data: Dict, isl_bw: int, udl_bw: int, utilisation: float
+) -> Tuple[Dict, int, int]:
+    """The per-path loop replaced by the block-wise assignment, with the path ends read as -1."""
+    max_updown, max_isl = int(udl_bw * utilisation), int(isl_bw * utilisation)
+    bw_data = {ed: (BwInfo(0, isl_bw) if -1 not in ed else BwInfo(0, udl_bw)) for ed in edge_data}
+    allocated, dropped = 0, 0
+    for path_id in path_list:
+        path = [-1] + path_data[(path_id[0], path_id[1])][path_id[2]][0][1:-1] + [-1]
+        eds = list(get_edges(path))
+        if all(bw_data[ed].idle_bw + 1 <= (max_updown if -1 in ed else max_isl) for ed in eds):
+            allocated += 1
+            for ed in eds:
+                bw_data[ed].idle_bw += 1
+                bw_data[(ed[1], ed[0])].idle_bw += 1
+        else:
+            dropped += 1
+    return bw_data, allocated, dropped
+
+
+def check_assign_strategy() -> None:
+    rng = random.Random(SEED)
+    path_data, edge_data, path_list = synthetic_routing(rng)
+    reference, allocated, dropped = original_assign(path_data, path_list, edge_data, 60, 25, 0.9)
+    for block_size in BLOCK_SIZES:
+        before = copy.deepcopy(path_data)
+        bw_data = BidirBwAssignStrat(60, 25, 0.9, block_size=block_size).compute(path_data, path_list, edge_data)
+        assert path_data == before, "compute modified path_data"
+        assert all(bw_data[ed].idle_bw == reference[ed].idle_bw for ed in edge_data), f"Block {block_size}: loads"
+    print(f"BidirBwAssignStrat: {allocated} allocated, {dropped} dropped, identical loads with all block sizes")
+
+
+if __name__ == "__main__":
+    check_random_cases()
+    check_assign_strategy()
@@ -0,0 +1,71 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Parity check of the "csr" KSP engine of KSPRoutStrat against the original "networkx" one.
+The constellation, grid and coverage are computed as in the first configured run of
+configurations/icarus_configuration.py. The same random sample of grid pairs is then routed by both engines for every
+k from 1 to 10. The two engines must return the same number of paths, with the same lengths. Every csr path must also
+be a valid simple path whose length is the sum of its links. Equal-length paths can be found in a different order, so
+differing node sequences are only counted.
+Run from the repository root: PYTHONPATH=. python development_tools/check_ksp_engine_parity.py [num_pairs]
+"""
+import math
+import random
+import sys
+import time
+
+from configurations.icarus_configuration import CONFIG, parse_config
+from development_tools.benchmark_routing_search import prepare_inputs
+from icarus_simulator.sat_core.routing_graph import GroundOverlay
+from icarus_simulator.strategies.routing import KSPRoutStrat
+
+NUM_PAIRS = 300
+SEED = 42
+K_VALUES = range(1, 11)
+
+
+def path_length(overlay: GroundOverlay, path) -> float:
+    assert len(set(path)) == len(path), f"Path {path} is not simple"
+    return sum(overlay[path[i]][path[i + 1]]["length"] for i in range(len(path) - 1))
+
+
+def run_check(num_pairs: int) -> None:
+    conf = parse_config(CONFIG)[0]
+    stretch = conf["rout"]["desirability_stretch"]
+    grid, network, coverage = prepare_inputs(conf)
+    grid_ids = list(grid.keys())
+    random.seed(SEED)
+    pairs = set()
+    while len(pairs) < num_pairs:
+        src, dst = random.sample(grid_ids, 2)
+        pairs.add((min(src, dst), max(src, dst)))
+    pairs = sorted(pairs)
+    print(f"{len(grid_ids)} grid points, {network.number_of_nodes()} satellites, {len(pairs)} pairs")
+
+    for k in K_VALUES:
+        times, results = {}, {}
+        for engine in ("networkx", "csr"):
+            strat = KSPRoutStrat(stretch, k, ksp_engine=engine)
+            start = time.time()
+            strat.prepare(grid, network, coverage)
+            results[engine] = [strat.compute(pair, grid, network, coverage) for pair in pairs]
+            times[engine] = time.time() - start
+        reordered = 0
+        for pair, ref, new in zip(pairs, results["networkx"], results["csr"]):
+            ref_lens, new_lens = [ln for _, ln in ref], [ln for _, ln in new]
+            assert len(ref_lens) == len(new_lens) and all(
+                math.isclose(a, b, rel_tol=1e-9) for a, b in zip(ref_lens, new_lens)
+            ), f"k={k}, pair {pair}: lengths {ref_lens} != {new_lens}"
+            overlay = GroundOverlay(network, {-gnd: coverage[gnd] for gnd in pair})
+            for path, length in new:
+                assert path[0] == -pair[0] and path[-1] == -pair[1], f"k={k}, pair {pair}: wrong ends {path}"
+                assert math.isclose(path_length(overlay, path), length, rel_tol=1e-9), f"k={k}, pair {pair}: length"
+            reordered += [path for path, _ in ref] != [path for path, _ in new]
+        print(
+            f"k={k:<2} networkx {times['networkx']:7.2f}s  csr {times['csr']:7.2f}s  "
+            f"paths {sum(map(len, results['csr']))}  equal-length reorderings {reordered}"
+        )
+    print("Same path lengths with both engines")
+
+
+if __name__ == "__main__":
+    run_check(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_PAIRS)
@@ -0,0 +1,89 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Parity check of the vectorised "numpy" propagator against the per-satellite "ephem" one.
+The same Walker shells are built with both propagators, and their positions and ISL lengths are compared over several
+epoch offsets, both through the batched compute_positions_at_epoch_offsets and through the single-offset network
+update used by ManhLSNStrat. The check fails if any difference exceeds the tolerances below.
+Run from the repository root: PYTHONPATH=. python development_tools/check_propagator_parity.py
+"""
+import numpy as np
+
+from icarus_simulator.sat_core import WalkerConstellationNetwork
+
+EPOCH = "2020/01/01 00:00:00"
+# Shells as (sats_per_orbit, orbits, inclination, f, elevation in m)
+SHELLS = [
+    (22, 72, 53, 11, 550000),
+    (20, 10, 97.6, 3, 1000000),
+    (40, 40, 70, 5, 1325000),
+]
+# Epoch offsets in seconds, fractional ones included
+OFFSETS = np.array([0, 37.5, 137, 600, 3600, 6 * 3600 + 123.25, 86400, 3 * 86400])
+# Maximum absolute differences: degrees for lat and lon, metres for elevation and ISL lengths
+LAT_TOL = 1e-4
+LON_TOL = 2e-3
+ELEV_TOL = 10.0
+ISL_TOL = 10.0
+
+
+def position_errors(ref: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Maximum lat, lon and elev differences of two (..., N, 3) position arrays. Lon is compared modulo 360."""
+    diff = np.abs(ref - new)
+    diff[..., 1] = np.abs((ref[..., 1] - new[..., 1] + 180) % 360 - 180)
+    return diff.reshape(-1, 3).max(axis=0)
+
+
+def check_errors(label: str, pos_err: np.ndarray, isl_err: float) -> None:
+    print(
+        f"{label:<40} lat {pos_err[0]:.2e}°  lon {pos_err[1]:.2e}°  elev {pos_err[2]:6.2f}m  isl {isl_err:6.2f}m"
+    )
+    assert pos_err[0] <= LAT_TOL, f"{label}: latitude difference {pos_err[0]} above {LAT_TOL}"
+    assert pos_err[1] <= LON_TOL, f"{label}: longitude difference {pos_err[1]} above {LON_TOL}"
+    assert pos_err[2] <= ELEV_TOL, f"{label}: elevation difference {pos_err[2]} above {ELEV_TOL}"
+    assert isl_err <= ISL_TOL, f"{label}: ISL length difference {isl_err} above {ISL_TOL}"
+
+
+def network_lengths(walker: WalkerConstellationNetwork, isls: np.ndarray) -> np.ndarray:
+    network = walker.cnet.network
+    return np.array([network[sat1][sat2]["length"] for sat1, sat2 in isls.tolist()])
+
+
+def run_check() -> None:
+    for spo, orbits, inclination, f, elevation in SHELLS:
+        walkers = {
+            prop: WalkerConstellationNetwork(
+                spo, orbits, inclination, EPOCH, f, elevation=elevation, propagator=prop
+            )
+            for prop in ("ephem", "numpy")
+        }
+        shell = f"{inclination}°{spo}x{orbits}f{f}e{elevation // 1000}km"
+
+        # Batched offsets
+        ref_pos, isls, ref_lens = walkers["ephem"].compute_networks_at_epoch_offsets(OFFSETS)
+        new_pos, new_isls, new_lens = walkers["numpy"].compute_networks_at_epoch_offsets(OFFSETS)
+        assert np.array_equal(isls, new_isls), f"{shell}: the ISL topologies differ"
+        assert new_pos.shape == (len(OFFSETS), spo * orbits, 3)
+        check_errors(f"{shell} batched", position_errors(ref_pos, new_pos), np.abs(ref_lens - new_lens).max())
+
+        # Single offsets, through the positions dict and the network update
+        for offset in OFFSETS.tolist():
+            hrs, rem = divmod(offset, 3600)
+            mins, secs = divmod(rem, 60)
+            positions, lengths = {}, {}
+            for prop, walker in walkers.items():
+                walker.compute_network_at_epoch_offset(int(hrs), int(mins), int(secs), int(round(secs % 1 * 1000)))
+                sats = walker.cnet.get_sats()
+                positions[prop] = np.array(
+                    [[sats[idx]["lat"], sats[idx]["lon"], sats[idx]["elev"]] for idx in range(len(sats))]
+                )
+                lengths[prop] = network_lengths(walker, isls)
+            check_errors(
+                f"{shell} offset {offset}s",
+                position_errors(positions["ephem"], positions["numpy"]),
+                np.abs(lengths["ephem"] - lengths["numpy"]).max(),
+            )
+    print("All differences within the tolerances")
+
+
+if __name__ == "__main__":
+    run_check()
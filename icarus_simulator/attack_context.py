@@ -0,0 +1,17 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Read-only data shared by all the samples of an attack phase, computed once per phase instead of once per sample.
+The AttackMultiprocessor builds the context before starting its workers, which inherit it copy-on-write when forked.
+"""
+from icarus_simulator.bw_table import BwView
+from icarus_simulator.structure_definitions import BwData
+
+
+class AttackContext:
+    def __init__(self, bw_data: BwData) -> None:
+        if isinstance(bw_data, BwView):
+            table = bw_data.table
+            uplink_caps = table.capacity[table.edge_index.src == -1]
+        else:
+            uplink_caps = [bw_data[ed].capacity for ed in bw_data if ed[0] == -1]
+        self.uplink_size = int(max(uplink_caps))  # Max in case of weird bw assignments
@@ -0,0 +1,37 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Multiprocessor for the attack phases, whose samples all run feasibility checks.
+Each worker opens the session of its copy of the feasibility strategy once, reuses it for all its samples, and closes
+it when done. The feasibility strategy is the element of process_params at position feas_idx.
+Before any worker starts, the AttackContext of the bw data at position bw_idx is built, and _prepare can precompute
+further shared data. The forked workers inherit both: this holds for the phases as well as for the job runners, which
+only prepare their own share of the samples.
+"""
+from typing import Dict
+
+from icarus_simulator.attack_context import AttackContext
+from icarus_simulator.multiprocessor import Multiprocessor
+from icarus_simulator.strategies.atk_feasibility_check.solver_sessions import (
+    worker_session,
+    close_worker_sessions,
+)
+
+
+class AttackMultiprocessor(Multiprocessor):
+    feas_idx: int = 0
+    bw_idx: int = 0
+
+    def process_batches(self) -> Dict:
+        self.context = AttackContext(self.process_params[self.bw_idx])
+        self._prepare()
+        return super().process_batches()
+
+    def _prepare(self) -> None:
+        return
+
+    def _init_worker(self, proc_id: int) -> None:
+        worker_session(self.process_params[self.feas_idx])
+
+    def _exit_worker(self, proc_id: int) -> None:
+        startup, solve = close_worker_sessions()
+        self._verbprint(f"Proc {proc_id} solver startup: {startup}, solve: {solve}")
@@ -0,0 +1,201 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Array-backed bandwidth data, indexed by edge id.
+BwTable holds the idle_bw and capacity of every directed edge in two NumPy arrays. BwView exposes it as BwData: a
+Mapping from the edge to a BwEntry, which reads and writes the arrays through the same attributes as BwInfo.
+The module also provides the block-wise greedy assignment of data quanta, and of aggregated demands, used by the
+bandwidth assignment strategies.
+"""
+from collections.abc import Mapping
+from typing import Iterator
+
+import numpy as np
+
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.structure_definitions import Edge
+
+
+class BwTable:
+    def __init__(self, edge_index: EdgeIndex, idle_bw: np.ndarray, capacity: np.ndarray) -> None:
+        assert len(idle_bw) == len(capacity) == len(edge_index)
+        self.edge_index = edge_index
+        self.idle_bw = idle_bw
+        self.capacity = capacity
+
+    @staticmethod
+    def from_capacities(edge_index: EdgeIndex, isl_bw: int, udl_bw: int) -> "BwTable":
+        """An idle table, with capacity udl_bw on the up and downlinks, isl_bw elsewhere."""
+        capacity = np.where(edge_index.is_updown, udl_bw, isl_bw).astype(np.int64)
+        return BwTable(edge_index, np.zeros(len(edge_index), dtype=np.int64), capacity)
+
+    def remaining_bw(self) -> np.ndarray:
+        return self.capacity - self.idle_bw
+
+    def view(self) -> "BwView":
+        return BwView(self)
+
+
+class BwEntry:
+    """BwInfo-compatible handle on one edge of a BwTable."""
+
+    __slots__ = ("table", "edge_id")
+
+    def __init__(self, table: BwTable, edge_id: int) -> None:
+        self.table = table
+        self.edge_id = edge_id
+
+    @property
+    def idle_bw(self) -> int:
+        return self.table.idle_bw[self.edge_id].item()
+
+    @idle_bw.setter
+    def idle_bw(self, value: int) -> None:
+        self.table.idle_bw[self.edge_id] = value
+
+    @property
+    def capacity(self) -> int:
+        return self.table.capacity[self.edge_id].item()
+
+    @capacity.setter
+    def capacity(self, value: int) -> None:
+        self.table.capacity[self.edge_id] = value
+
+    def get_remaining_bw(self) -> int:
+        return self.capacity - self.idle_bw
+
+    def __repr__(self) -> str:
+        return f"BwEntry(idle_bw={self.idle_bw}, capacity={self.capacity})"
+
+
+class BwView(Mapping):
+    """BwData view of a BwTable. The edges are fixed, their bandwidths can be updated through the entries."""
+
+    def __init__(self, table: BwTable) -> None:
+        self.table = table
+
+    def __getitem__(self, ed: Edge) -> BwEntry:
+        return BwEntry(self.table, self.table.edge_index.ids[ed])
+
+    def __contains__(self, ed) -> bool:
+        return ed in self.table.edge_index.ids
+
+    def __iter__(self) -> Iterator[Edge]:
+        return iter(self.table.edge_index.edges)
+
+    def __len__(self) -> int:
+        return len(self.table.edge_index)
+
+
+def greedy_block_assign(
+    hop_quanta: np.ndarray,
+    hop_links: np.ndarray,
+    num_quanta: int,
+    load: np.ndarray,
+    limit: np.ndarray,
+    block_size: int,
+) -> np.ndarray:
+    """
+    Allocate data quanta in order, each on all the links of its path, if every link keeps its load within the limit:
+    a quantum fits if load + 1 <= limit on all its links, and then adds one to the load per traversal.
+    The result is the one of the sequential greedy allocation, see greedy_block_split.
+    Args:
+        hop_quanta: Sorted quantum of every hop.
+        hop_links: Link of every hop.
+        num_quanta: Number of quanta.
+        load: Initial load of every link, updated in place.
+        limit: Maximum load of every link.
+        block_size: Number of quanta per block.
+
+    Returns:
+        np.ndarray: Boolean mask of the allocated quanta.
+    """
+    amounts = np.ones(num_quanta, dtype=np.int64)
+    return greedy_block_split(hop_quanta, hop_links, amounts, load, limit, block_size) > 0
+
+
+def greedy_block_split(
+    hop_demands: np.ndarray,
+    hop_links: np.ndarray,
+    amounts: np.ndarray,
+    load: np.ndarray,
+    limit: np.ndarray,
+    block_size: int,
+) -> np.ndarray:
+    """
+    Allocate aggregated demands in order, each on all the links of its path: a demand gets as much of its amount as
+    the fullest of its links can still take, so that it is split at the saturation point.
+    This is the sequential greedy allocation of the single quanta, with the quanta of each demand consecutive. In each
+    block of demands, those on a full link are dropped. A link is safe if its load stays within the limit even with
+    all the other demands of the block on it: the demands on safe links only are always fully allocated. The others
+    are allocated in order, on the unsafe links only, as they always fit on the safe ones.
+    Args:
+        hop_demands: Sorted demand of every hop.
+        hop_links: Link of every hop.
+        amounts: Integer amount of every demand.
+        load: Initial load of every link, updated in place.
+        limit: Maximum load of every link.
+        block_size: Number of demands per block.
+
+    Returns:
+        np.ndarray: The allocated amount of every demand.
+    """
+    num_demands = len(amounts)
+    hop_ptr = np.searchsorted(hop_demands, np.arange(num_demands + 1))
+    allocated = np.zeros(num_demands, dtype=np.int64)
+    for start in range(0, num_demands, block_size):
+        end = min(start + block_size, num_demands)
+        h_start, h_end = hop_ptr[start], hop_ptr[end]
+        block_demands, block_links = hop_demands[h_start:h_end] - start, hop_links[h_start:h_end]
+        # Loads only grow: the demands on a link already full never fit
+        candidate = amounts[start:end] > 0
+        candidate[block_demands[(load + 1 > limit)[block_links]]] = False
+        candidate_hop = candidate[block_demands]
+        demand = np.bincount(
+            block_links[candidate_hop],
+            weights=amounts[start:end][block_demands[candidate_hop]],
+            minlength=len(load),
+        ).astype(np.int64)
+        unsafe_link = load + demand > limit
+        unsafe_hop = unsafe_link[block_links] & candidate_hop
+        fits = candidate.copy()
+        fits[block_demands[unsafe_hop]] = False
+        alloc = np.where(fits, amounts[start:end], 0)
+
+        # Sequential split of the candidate demands on unsafe links, on those links only
+        unsafe_demands = np.flatnonzero(candidate & ~fits)
+        if len(unsafe_demands) > 0:
+            cur_load = {
+                link: ld
+                for link, ld in zip(
+                    np.flatnonzero(unsafe_link).tolist(), load[unsafe_link].tolist()
+                )
+            }
+            limits = {link: limit[link].item() for link in cur_load}
+            unsafe_ptr = (hop_ptr[start : end + 1] - h_start).tolist()
+            hop_unsafe_links = np.where(unsafe_hop, block_links, -1).tolist()
+            block_amounts = amounts[start:end].tolist()
+            for dem in unsafe_demands.tolist():
+                links = [
+                    link
+                    for link in hop_unsafe_links[unsafe_ptr[dem] : unsafe_ptr[dem + 1]]
+                    if link >= 0
+                ]
+                # A quantum fits while load + 1 <= limit, and loads a link as many times as its path traverses it
+                traversals = {}
+                for link in links:
+                    traversals[link] = traversals.get(link, 0) + 1
+                granted = min(
+                    [block_amounts[dem]]
+                    + [(limits[link] - cur_load[link] - 1) // num + 1 for link, num in traversals.items()]
+                )
+                if granted > 0:
+                    alloc[dem] = granted
+                    for link in links:
+                        cur_load[link] += granted
+
+        # Commit the allocated demands of the block
+        load += np.bincount(
+            block_links, weights=alloc[block_demands], minlength=len(load)
+        ).astype(np.int64)
+        allocated[start:end] = alloc
+    return allocated
@@ -0,0 +1,64 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Aggregated traffic demands, an alternative to the list of single data quanta chosen by the selection strategies.
+A DemandMatrix is a sparse matrix from the path, identified by its ordered sdpair and its index in the LbSet, to the
+number of quanta sent on it, stored as parallel coordinate and count arrays. The demands are kept in the order of
+the first quantum of each, so that allocating them in order is the same as allocating the quanta grouped by path.
+"""
+from typing import List
+
+import numpy as np
+
+from icarus_simulator.structure_definitions import PathId
+
+
+class DemandMatrix:
+    def __init__(self, src: np.ndarray, dst: np.ndarray, list_id: np.ndarray, count: np.ndarray) -> None:
+        assert len(src) == len(dst) == len(list_id) == len(count)
+        self.src = src
+        self.dst = dst
+        self.list_id = list_id
+        self.count = count
+
+    @staticmethod
+    def from_arrays(src: np.ndarray, dst: np.ndarray, list_id: np.ndarray) -> "DemandMatrix":
+        """Aggregate the quanta given by their path coordinates, in order of first occurrence."""
+        src, dst, list_id = np.asarray(src), np.asarray(dst), np.asarray(list_id)
+        if len(src) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return DemandMatrix(empty, empty.copy(), empty.copy(), empty.copy())
+        # lexsort is stable: the first quantum of each group of equal paths is its first occurrence
+        order = np.lexsort((list_id, dst, src))
+        s_src, s_dst, s_id = src[order], dst[order], list_id[order]
+        new_group = np.ones(len(order), dtype=bool)
+        new_group[1:] = (s_src[1:] != s_src[:-1]) | (s_dst[1:] != s_dst[:-1]) | (s_id[1:] != s_id[:-1])
+        starts = np.flatnonzero(new_group)
+        count = np.diff(np.append(starts, len(order)))
+        by_first = np.argsort(order[starts], kind="stable")
+        starts = starts[by_first]
+        return DemandMatrix(
+            s_src[starts].astype(np.int64),
+            s_dst[starts].astype(np.int64),
+            s_id[starts].astype(np.int64),
+            count[by_first].astype(np.int64),
+        )
+
+    @staticmethod
+    def from_path_ids(path_list: List[PathId]) -> "DemandMatrix":
+        arr = np.array(path_list, dtype=np.int64).reshape(-1, 3)
+        return DemandMatrix.from_arrays(arr[:, 0], arr[:, 1], arr[:, 2])
+
+    def __len__(self) -> int:
+        return len(self.count)
+
+    @property
+    def num_quanta(self) -> int:
+        return int(self.count.sum())
+
+    def path_ids(self) -> List[PathId]:
+        """The PathId of every demand."""
+        return list(zip(self.src.tolist(), self.dst.tolist(), self.list_id.tolist()))
+
+    def to_path_list(self) -> List[PathId]:
+        """The single quanta, grouped by demand."""
+        return [path_id for path_id, cnt in zip(self.path_ids(), self.count.tolist()) for _ in range(cnt)]
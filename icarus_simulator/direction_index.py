@@ -0,0 +1,128 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Directions of the attacks through the directed edges, computed at most once per edge from the routing and edge
+results.
+For each edge, the paths through it in its direction and in the opposite one are turned, in the same order as in
+DirectionalFilteringStrat, into directions truncated at the edge end, and their source-destination pairs. Per edge id,
+the index stores two small int arrays: the distinct directions, as the path they are cut from and the cut position,
+and the pairs, as their direction and source-destination. A DirectionData for any set of edges and allowed sources is
+then read without walking the paths through the edges again, and only the directions of allowed sources are built.
+Edges are indexed on their first request, or in advance with build, e.g. by the parent process before forking. The index
+is held by its user, e.g. DirectionalFilteringStrat, and is dropped with it.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.path_store import PathStore
+from icarus_simulator.structure_definitions import (
+    Edge,
+    Path,
+    PathData,
+    PathId,
+    EdgeData,
+    DirectionData,
+    TuplePath,
+)
+
+
+class DirectionIndex:
+    def __init__(self, edge_data: EdgeData, path_data: PathData) -> None:
+        self.edge_data = edge_data
+        self.path_data = path_data
+        self.edge_index = EdgeIndex(list(edge_data.keys()))
+        self.directions: List[Optional[np.ndarray]] = [None] * len(self.edge_index)
+        self.pairs: List[Optional[np.ndarray]] = [None] * len(self.edge_index)
+        self._allowed: Optional[Tuple[List[int], np.ndarray]] = None
+
+    def build(self, edges: List[Edge]) -> None:
+        """Index the edges not indexed yet."""
+        for edge in edges:
+            edge_id = self.edge_index.edge_id(edge)
+            if self.pairs[edge_id] is None:
+                self.directions[edge_id], self.pairs[edge_id] = self._edge_directions(edge)
+
+    def _path(self, path_id: PathId) -> Path:
+        if isinstance(self.path_data, PathStore):
+            return self.path_data.path((path_id[0], path_id[1]), path_id[2])
+        return self.path_data[(path_id[0], path_id[1])][path_id[2]][0]
+
+    def _edge_directions(self, edge: Edge) -> Tuple[np.ndarray, np.ndarray]:
+        inv_ed = (edge[1], edge[0])
+        idxs_in_order = self.edge_data[edge].paths_through
+        idxs_in_rev = self.edge_data[inv_ed].paths_through
+
+        # Avoid duplicate indices. It can occur that gnd-sat-gnd paths are in both lists
+        set_in_order, set_in_rev = set(idxs_in_order), set(idxs_in_rev)
+        set_in_rev.difference_update(set_in_order)
+        idxs_in_rev = list(set_in_rev)
+
+        # Extract the path in the correct order
+        idxs = idxs_in_order + idxs_in_rev
+        dir_pos: Dict[TuplePath, int] = {}
+        directions, pairs = [], []
+        for i, idx in enumerate(idxs):
+            in_order = i < len(idxs_in_order)
+            base_path = self._path(idx)
+            pair = idx[0], idx[1]
+            if not in_order:
+                base_path = base_path[::-1]
+                pair = idx[1], idx[0]
+
+            # Path truncation
+            # Cut the path at the target if ed[1] != -1. In this case the whole path is kept.
+            if edge[1] != -1:
+                last_idx = base_path.index(edge[1])
+                truncated = tuple(base_path[1 : last_idx + 1])
+            else:
+                last_idx = 0
+                truncated = tuple(base_path[1:-1])
+            pos = dir_pos.setdefault(truncated, len(dir_pos))
+            if pos == len(directions):
+                directions.append((idx[0], idx[1], idx[2], int(not in_order), last_idx))
+            pairs.append((pos, pair[0], pair[1]))
+        return (
+            np.array(directions, dtype=np.int32).reshape(-1, 5),
+            np.array(pairs, dtype=np.int32).reshape(-1, 3),
+        )
+
+    def _direction(self, edge: Edge, direction: np.ndarray) -> TuplePath:
+        src, dst, list_id, reverse, cut = direction.tolist()
+        base_path = self._path((src, dst, list_id))
+        if reverse:
+            base_path = base_path[::-1]
+        if edge[1] != -1:
+            return tuple([-1] + base_path[1 : cut + 1])
+        return tuple([-1] + base_path[1:-1] + [-1])
+
+    def allowed_mask(self, allowed_sources: List[int]) -> np.ndarray:
+        """Boolean array over the gnd ids, True for the allowed sources. The mask of the last list is reused."""
+        if self._allowed is None or self._allowed[0] is not allowed_sources:
+            mask = np.zeros(max(allowed_sources, default=0) + 1, dtype=bool)
+            mask[[gnd for gnd in allowed_sources if gnd >= 0]] = True
+            self._allowed = allowed_sources, mask
+        return self._allowed[1]
+
+    def direction_data(self, edges: List[Edge], allowed_sources: List[int]) -> DirectionData:
+        self.build(edges)
+        allowed = self.allowed_mask(allowed_sources)
+        direction_data = {}
+        for edge in edges:
+            edge_id = self.edge_index.edge_id(edge)
+            directions, pairs = self.directions[edge_id], self.pairs[edge_id]
+            # Skip the pairs whose source is not in the allowed sources
+            srcs = pairs[:, 1]
+            pairs = pairs[(srcs < len(allowed)) & allowed[np.minimum(srcs, len(allowed) - 1)]]
+            built: Dict[int, TuplePath] = {}
+            for pos, src, dst in pairs.tolist():
+                direction = built.get(pos)
+                if direction is None:
+                    direction = built[pos] = self._direction(edge, directions[pos])
+                # Note that we are not adding ordered pairs! Sending data from a to b is different
+                # than sending from b to a, the probability of hitting the target is different!
+                if direction not in direction_data:
+                    direction_data[direction] = []
+                direction_data[direction].append((src, dst))  # Add multiple times if needed
+        return direction_data
+
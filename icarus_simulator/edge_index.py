@@ -0,0 +1,101 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Dense integer ids for the directed edges of a constellation network, shared by the phases after routing.
+The edges are the ISLs in both directions, then the uplinks (-1, sat) and downlinks (sat, -1) of every satellite: all
+the ground nodes are merged into -1, as in EdgeData and BwData, so the index only depends on the network.
+Per-edge data can then be stored in NumPy arrays indexed by edge id, and exposed to the existing strategies through
+the dict-compatible EdgeValues.
+"""
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import networkx as nx
+import numpy as np
+
+from icarus_simulator.structure_definitions import Edge, Path
+from icarus_simulator.utils import LastValueCache
+
+
+class EdgeIndex:
+    """Bijection between the directed edges of a network and the ids 0..len-1."""
+
+    def __init__(self, edges: List[Edge]) -> None:
+        self.edges: List[Edge] = edges
+        self.ids: Dict[Edge, int] = {ed: idx for idx, ed in enumerate(edges)}
+        assert len(self.ids) == len(edges)
+        self.src = np.array([ed[0] for ed in edges], dtype=np.int32)
+        self.dst = np.array([ed[1] for ed in edges], dtype=np.int32)
+        # Id of the same edge in the opposite direction
+        self.inverse = np.array([self.ids[(ed[1], ed[0])] for ed in edges], dtype=np.int64)
+        self.is_updown = (self.src == -1) | (self.dst == -1)
+
+    @staticmethod
+    def from_network(network: nx.Graph, sat_ids: Optional[Iterable[int]] = None) -> "EdgeIndex":
+        """Index the network edges in EdgeData order. Up and downlinks are added for sat_ids, all nodes by default."""
+        if sat_ids is None:
+            sat_ids = sorted(network.nodes)
+        sat_ids = list(sat_ids)
+        edges = list(network.edges())
+        edges.extend([(ed[1], ed[0]) for ed in edges])
+        edges.extend([(-1, sat) for sat in sat_ids])
+        edges.extend([(sat, -1) for sat in sat_ids])
+        return EdgeIndex(edges)
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __contains__(self, ed) -> bool:
+        return ed in self.ids
+
+    def edge_id(self, ed: Edge) -> int:
+        return self.ids[ed]
+
+    def edge(self, edge_id: int) -> Edge:
+        return self.edges[edge_id]
+
+    def path_edge_ids(self, path: Path) -> List[int]:
+        """Ids of the edges of a gnd-to-gnd path, whose first and last nodes count as -1."""
+        ids = self.ids
+        eids = [ids[(-1, path[1])]]
+        eids.extend(ids[(path[i], path[i + 1])] for i in range(1, len(path) - 2))
+        eids.append(ids[(path[-2], -1)])
+        return eids
+
+    def values(self, array: np.ndarray) -> "EdgeValues":
+        return EdgeValues(self, array)
+
+
+class EdgeValues(MutableMapping):
+    """Dict-compatible view of an array indexed by edge id. Values can be updated, edges cannot be added or removed."""
+
+    def __init__(self, index: EdgeIndex, array: np.ndarray) -> None:
+        assert len(array) == len(index)
+        self.index = index
+        self.array = array
+
+    def __getitem__(self, ed: Edge):
+        value = self.array[self.index.ids[ed]]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __setitem__(self, ed: Edge, value) -> None:
+        self.array[self.index.ids[ed]] = value
+
+    def __delitem__(self, ed: Edge) -> None:
+        raise TypeError("The edges of an EdgeValues cannot be removed")
+
+    def __contains__(self, ed) -> bool:
+        return ed in self.index.ids
+
+    def __iter__(self) -> Iterator[Edge]:
+        return iter(self.index.edges)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+_index_cache = LastValueCache(EdgeIndex.from_network)
+
+
+def get_edge_index(network: nx.Graph) -> EdgeIndex:
+    """Return the index of the last network, building a new one only if the network object changed."""
+    return _index_cache.get(network)
@@ -44,6 +44,13 @@ class Multiprocessor:
     ) -> None:
         raise NotImplementedError
 
+    # Optional worker initializer and finalizer, run once per process around its samples
+    def _init_worker(self, proc_id: int) -> None:
+        return
+
+    def _exit_worker(self, proc_id: int) -> None:
+        return
+
     def process_batches(self) -> Dict:
         batch_start = 0
         samples_len = len(self.samples)
@@ -92,6 +99,7 @@ class Multiprocessor:
         samples_len = len(samples_proc)
         last_min = 0
         thread_result = {}
+        self._init_worker(proc_id)
         for s_id, sample in enumerate(samples_proc):
             minute = int((time.time() - st) / 60)
             if minute != last_min:
@@ -100,6 +108,7 @@ class Multiprocessor:
                 )
                 last_min = minute
             self._single_sample_process(sample, thread_result, self.process_params)
+        self._exit_worker(proc_id)
 
         return_dict[proc_id] = pickle.dumps(thread_result)
         self._verbprint(
@@ -0,0 +1,133 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Sparse path-by-edge incidence matrix of the routing results.
+Row j is the j-th path of a PathStore, column e is the edge of id e in an EdgeIndex, the up and downlinks following the
+-1 convention. The matrix is built in one vectorised pass over the flat path arrays, its column sums are the edge
+centralities, and its CSC columns are the paths through every edge. PathsThrough exposes a column as the list of
+PathIds that EdgeInfo.paths_through used to hold: all the columns share one matrix, which is pickled only once.
+"""
+from collections.abc import Sequence
+from typing import List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.path_store import PathStore
+from icarus_simulator.structure_definitions import PathId
+
+
+def hop_edge_ids(
+    nodes: np.ndarray, path_ptr: np.ndarray, edge_index: EdgeIndex
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map every hop of concatenated gnd-to-gnd paths to its edge id, the first and last nodes of each path counting as -1.
+    Args:
+        nodes: int64 concatenated paths.
+        path_ptr: int64 offsets, path j is nodes[path_ptr[j]:path_ptr[j+1]].
+        edge_index: The index of the edges.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The path of every hop, and the edge id of the hop, in path order.
+    """
+    num_paths = len(path_ptr) - 1
+    rows = np.repeat(np.arange(num_paths), np.diff(path_ptr) - 1)
+    hop_start = np.arange(len(rows)) + rows  # Skip one position at every path boundary
+    u, v = nodes[hop_start], nodes[hop_start + 1]
+    u[path_ptr[:-1] - np.arange(num_paths)] = -1
+    v[path_ptr[1:] - 2 - np.arange(num_paths)] = -1
+
+    # Edge ids by binary search in the sorted edge keys
+    base = int(max(edge_index.src.max(), edge_index.dst.max())) + 2
+    edge_keys = (edge_index.src.astype(np.int64) + 1) * base + edge_index.dst + 1
+    order = np.argsort(edge_keys)
+    hop_keys = (u + 1) * base + v + 1
+    pos = np.searchsorted(edge_keys[order], hop_keys)
+    cols = order[np.minimum(pos, len(order) - 1)]
+    assert np.all(edge_keys[cols] == hop_keys), "Some path edges are not in the edge index"
+    return rows, cols
+
+
+class PathIncidence:
+    def __init__(self, store: PathStore, edge_index: EdgeIndex) -> None:
+        self.num_paths = len(store.lengths)
+        nodes = np.asarray(store.nodes, dtype=np.int64)
+        path_ptr = np.asarray(store.path_ptr, dtype=np.int64)
+
+        # PathId of every path
+        pair_ptr = np.asarray(store.pair_ptr, dtype=np.int64)
+        keys = np.asarray(store.pair_keys, dtype=np.int64)
+        path_pair = np.repeat(np.arange(len(keys)), np.diff(pair_ptr))
+        self.path_src = (keys >> 32)[path_pair].astype(np.int32)
+        self.path_dst = (keys & 0xFFFFFFFF)[path_pair].astype(np.int32)
+        self.path_list_id = (np.arange(self.num_paths) - pair_ptr[path_pair]).astype(np.int32)
+
+        rows, cols = hop_edge_ids(nodes, path_ptr, edge_index)
+        self.csc = csr_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, cols)),
+            shape=(self.num_paths, len(edge_index)),
+        ).tocsc()
+        self.csc.sort_indices()
+        # First and last gnd of every path
+        self.path_first = -nodes[path_ptr[:-1]]
+        self.path_last = -nodes[path_ptr[1:] - 1]
+
+    def __getstate__(self):
+        # Only the matrix and the PathIds are needed to read the paths through the edges
+        state = self.__dict__.copy()
+        del state["path_first"], state["path_last"]
+        return state
+
+    def edge_counts(self) -> np.ndarray:
+        """Number of paths through every edge, in its direction."""
+        return np.asarray(self.csc.sum(axis=0, dtype=np.int64)).ravel()
+
+    def paths_through(self, edge_id: int) -> List[PathId]:
+        rows = self.csc.indices[self.csc.indptr[edge_id] : self.csc.indptr[edge_id + 1]]
+        return list(
+            zip(
+                self.path_src[rows].tolist(),
+                self.path_dst[rows].tolist(),
+                self.path_list_id[rows].tolist(),
+            )
+        )
+
+
+class PathsThrough(Sequence):
+    """The PathIds through one edge, read from the shared incidence matrix. Behaves as a read-only list."""
+
+    def __init__(self, incidence: PathIncidence, edge_id: int) -> None:
+        self.incidence = incidence
+        self.edge_id = edge_id
+
+    def _list(self) -> List[PathId]:
+        return self.incidence.paths_through(self.edge_id)
+
+    def __getitem__(self, idx):
+        # Read only the requested rows of the column
+        csc, inc = self.incidence.csc, self.incidence
+        rows = csc.indices[csc.indptr[self.edge_id] : csc.indptr[self.edge_id + 1]][idx]
+        if isinstance(idx, slice):
+            return list(
+                zip(inc.path_src[rows].tolist(), inc.path_dst[rows].tolist(), inc.path_list_id[rows].tolist())
+            )
+        return int(inc.path_src[rows]), int(inc.path_dst[rows]), int(inc.path_list_id[rows])
+
+    def __len__(self) -> int:
+        csc = self.incidence.csc
+        return int(csc.indptr[self.edge_id + 1] - csc.indptr[self.edge_id])
+
+    def __iter__(self):
+        return iter(self._list())
+
+    def __add__(self, other) -> List[PathId]:
+        return self._list() + list(other)
+
+    def __radd__(self, other) -> List[PathId]:
+        return list(other) + self._list()
+
+    def __eq__(self, other) -> bool:
+        return self._list() == list(other)
+
+    def __repr__(self) -> str:
+        return repr(self._list())
@@ -0,0 +1,111 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Array-backed store of the routing results, a compact replacement for the PathData dictionary.
+All the paths are concatenated in one int32 node array, delimited by a path offset array, with one float32 length per
+path. The sdpairs are encoded as sorted int64 keys, each with its range of paths. The store is a read-only Mapping
+from the sdpair to its LbSet, built on access, so that the phases and strategies reading PathData work unchanged.
+The store pickles as a few arrays, so that the phase results are persisted and loaded without millions of Python
+objects.
+"""
+from collections.abc import Mapping
+from typing import Iterator
+
+import numpy as np
+
+from icarus_simulator.structure_definitions import PathData, SdPair, LbSet, Path
+
+
+def _pair_key(pair: SdPair) -> int:
+    return (int(pair[0]) << 32) + int(pair[1])
+
+
+class PathStore(Mapping):
+    """Read-only PathData, stored in flat arrays."""
+
+    def __init__(
+        self,
+        pair_keys: np.ndarray,
+        pair_ptr: np.ndarray,
+        path_ptr: np.ndarray,
+        nodes: np.ndarray,
+        lengths: np.ndarray,
+    ) -> None:
+        """
+        Args:
+            pair_keys: (P,) sorted int64 sdpair keys, src << 32 + dst.
+            pair_ptr: (P+1,) int64, the paths of the i-th sdpair are pair_ptr[i]:pair_ptr[i+1].
+            path_ptr: (M+1,) int64, the nodes of the j-th path are nodes[path_ptr[j]:path_ptr[j+1]].
+            nodes: (L,) int32 concatenated paths, with the negative gnd indices at their ends.
+            lengths: (M,) float32 path lengths.
+        """
+        self.pair_keys = pair_keys
+        self.pair_ptr = pair_ptr
+        self.path_ptr = path_ptr
+        self.nodes = nodes
+        self.lengths = lengths
+
+    @staticmethod
+    def from_path_data(path_data: PathData) -> "PathStore":
+        pairs = sorted(path_data.keys())
+        keys = np.array([_pair_key(pair) for pair in pairs], dtype=np.int64)
+        lbsets = [path_data[pair] for pair in pairs]
+        pair_ptr = np.zeros(len(pairs) + 1, dtype=np.int64)
+        pair_ptr[1:] = np.cumsum([len(lbset) for lbset in lbsets])
+        paths = [path for lbset in lbsets for path, _ in lbset]
+        path_ptr = np.zeros(len(paths) + 1, dtype=np.int64)
+        path_ptr[1:] = np.cumsum([len(path) for path in paths])
+        nodes = np.fromiter(
+            (node for path in paths for node in path), dtype=np.int32, count=int(path_ptr[-1])
+        )
+        lengths = np.array(
+            [length for lbset in lbsets for _, length in lbset], dtype=np.float32
+        )
+        return PathStore(keys, pair_ptr, path_ptr, nodes, lengths)
+
+    def pair_index(self, pair: SdPair) -> int:
+        """Position of the sdpair in the store, -1 if absent."""
+        key = _pair_key(pair)
+        idx = int(np.searchsorted(self.pair_keys, key))
+        if idx < len(self.pair_keys) and int(self.pair_keys[idx]) == key:
+            return idx
+        return -1
+
+    def num_paths(self, pair: SdPair) -> int:
+        idx = self.pair_index(pair)
+        if idx < 0:
+            raise KeyError(pair)
+        return int(self.pair_ptr[idx + 1] - self.pair_ptr[idx])
+
+    def path(self, pair: SdPair, list_id: int) -> Path:
+        """The list_id-th path of the sdpair, without building the whole LbSet."""
+        idx = self.pair_index(pair)
+        if idx < 0 or not 0 <= list_id < self.pair_ptr[idx + 1] - self.pair_ptr[idx]:
+            raise KeyError((pair, list_id))
+        path_id = int(self.pair_ptr[idx]) + list_id
+        return self.nodes[self.path_ptr[path_id] : self.path_ptr[path_id + 1]].tolist()
+
+    def __getitem__(self, pair: SdPair) -> LbSet:
+        idx = self.pair_index(pair)
+        if idx < 0:
+            raise KeyError(pair)
+        start, end = int(self.pair_ptr[idx]), int(self.pair_ptr[idx + 1])
+        bounds = self.path_ptr[start : end + 1].tolist()
+        nodes = self.nodes[bounds[0] : bounds[-1]].tolist()
+        offset = bounds[0]
+        return [
+            (nodes[bounds[i] - offset : bounds[i + 1] - offset], length)
+            for i, length in enumerate(self.lengths[start:end].tolist())
+        ]
+
+    def __contains__(self, pair) -> bool:
+        try:
+            return self.pair_index(pair) >= 0
+        except (TypeError, ValueError, IndexError):
+            return False
+
+    def __len__(self) -> int:
+        return len(self.pair_keys)
+
+    def __iter__(self) -> Iterator[SdPair]:
+        for key in self.pair_keys.tolist():
+            yield key >> 32, key & 0xFFFFFFFF
@@ -4,6 +4,8 @@ from typing import List, Tuple, Dict
 
 import networkx as nx
 
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.path_store import PathStore
 from icarus_simulator.strategies.edge.base_edge_strat import BaseEdgeStrat
 from icarus_simulator.strategies.base_strat import BaseStrat
 from icarus_simulator.phases.base_phase import BasePhase
@@ -68,6 +70,16 @@ class EdgePhase(BasePhase):
     def _compute(
         self, path_data: PathData, network: nx.Graph, sat_pos: SatPos, grid_pos: GridPos
     ) -> Tuple[EdgeData]:
+        # Vectorised computation over the compact path arrays, if the strategy supports it
+        edge_index = EdgeIndex.from_network(network, sat_pos.keys())
+        if not isinstance(path_data, PathStore):
+            store = PathStore.from_path_data(path_data)
+        else:
+            store = path_data
+        edge_data = self.ed_strat.compute_all(store, edge_index, grid_pos)
+        if edge_data is not None:
+            return (edge_data,)  # Must be a tuple!
+
         # Isolate all paths to be computed
         all_paths = [
             (pd[0], (pair[0], pair[1], list_id))
@@ -85,13 +97,9 @@ class EdgePhase(BasePhase):
             )
             edge_infos: Dict[Edge, TempEdgeInfo] = multi.process_batches()
 
-        # Transform to EdgeInfo and add the missing edges
-        all_edges = list(network.edges())
-        all_edges.extend([(ed[1], ed[0]) for ed in all_edges])
-        all_edges.extend([(-1, sat) for sat in sat_pos])
-        all_edges.extend([(sat, -1) for sat in sat_pos])
+        # Transform to EdgeInfo and add the missing edges, in edge id order
         edge_data = {}
-        for ed in all_edges:
+        for ed in edge_index.edges:
             if ed in edge_infos:
                 tup = edge_infos[ed]
                 edge_data[ed] = EdgeInfo(
@@ -1,13 +1,16 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
 
-from typing import List, Tuple
-import copy
+from typing import Dict, List, Tuple
 from icarus_simulator.phases.base_phase import BasePhase
 from icarus_simulator.strategies.atk_detect_optimisation.base_optim_strat import (
     BaseOptimStrat,
 )
 from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
     BaseFeasStrat,
+    FeasResult,
+)
+from icarus_simulator.strategies.atk_feasibility_check.solver_sessions import (
+    worker_session,
 )
 from icarus_simulator.strategies.atk_geo_constraint.base_geo_constraint_strat import (
     BaseGeoConstraintStrat,
@@ -16,7 +19,7 @@ from icarus_simulator.strategies.atk_path_filtering.base_path_filtering_strat im
     BasePathFilteringStrat,
 )
 from icarus_simulator.strategies.base_strat import BaseStrat
-from icarus_simulator.multiprocessor import Multiprocessor
+from icarus_simulator.attack_multiprocessor import AttackMultiprocessor
 from icarus_simulator.structure_definitions import (
     GridPos,
     Pname,
@@ -26,8 +29,12 @@ from icarus_simulator.structure_definitions import (
     Edge,
     AttackInfo,
     AttackData,
+    DirectionData,
 )
 
+# Number of consecutive edges of a worker whose feasibility is checked together, e.g. in one HiGHS program
+FEAS_BATCH_SIZE = 32
+
 
 class LinkAttackPhase(BasePhase):
     def __init__(
@@ -120,7 +127,39 @@ class LinkAttackPhase(BasePhase):
         return
 
 
-class AttackMultiproc(Multiprocessor):
+class AttackMultiproc(AttackMultiprocessor):
+    feas_idx = 1
+    bw_idx = 5
+
+    def _prepare(self) -> None:
+        # Filter the paths through the edges of this multiprocessor only, once for all the workers
+        filter_strat, _, _, path_data, edge_data, _, _ = self.process_params
+        filter_strat.prepare(self.samples, edge_data, path_data)
+
+    def _proc_worker(self, proc_id: int, return_dict, samples_proc: List) -> None:
+        # Keep the samples of this worker, whose feasibility is checked in batches as they come
+        self._worker_samples, self._next_sample = samples_proc, 0
+        self._checked: Dict[Edge, Tuple[DirectionData, FeasResult]] = {}
+        super()._proc_worker(proc_id, return_dict, samples_proc)
+
+    def _check_batch(self, feas_strat: BaseFeasStrat, params: Tuple) -> None:
+        """A3 and A4 for the next FEAS_BATCH_SIZE samples of the worker, the feasibility checks all at once."""
+        filter_strat, _, _, path_data, edge_data, bw_data, allowed_sources = params
+        uplink_size = self.context.uplink_size
+        batch = self._worker_samples[self._next_sample : self._next_sample + FEAS_BATCH_SIZE]
+        self._next_sample += len(batch)
+        all_directions = [
+            filter_strat.compute([edge], edge_data, path_data, allowed_sources)
+            for edge in batch
+        ]
+        results = feas_strat.compute_batch(
+            [
+                ([edge], path_data, bw_data, direction_data, uplink_size)
+                for edge, direction_data in zip(batch, all_directions)
+            ]
+        )
+        self._checked.update(zip(batch, zip(all_directions, results)))
+
     def _single_sample_process(
         self, sample: Edge, process_result: AttackData, params: Tuple
     ) -> None:
@@ -136,29 +175,21 @@ class AttackMultiproc(Multiprocessor):
             bw_data,
             allowed_sources,
         ) = params
-        feas_strat = copy.deepcopy(feas_strat)
-        feas_strat.empty_enviorment()
+        feas_strat = worker_session(feas_strat)
         # This method computes the attack phases.
         # A1 is comprised of all the previously done work until here.
         # A2 is instead irrelevant as there is no bneck choice.
-        # A3: path filtering
-        direction_data = filter_strat.compute(
-            [sample], edge_data, path_data, allowed_sources
-        )
-
-        # A4: feasibility check
-        uplink_size = max(
-            bw_data[ed].capacity for ed in bw_data if ed[0] == -1
-        )  # Max in case of weird bw assignments
-        atk_flow_set, on_trg, detect = feas_strat.compute(
-            [sample], path_data, bw_data, direction_data, uplink_size
-        )
+        # A3: path filtering, and A4: feasibility check, done for a batch of samples
+        if sample not in self._checked:
+            self._check_batch(feas_strat, params)
+        direction_data, (atk_flow_set, on_trg, detect) = self._checked.pop(sample)
         if atk_flow_set is None:
             process_result[sample] = None
             return
 
         # A5: iterative optimisation
         # We firstly need the maximum increase value possible, that is maximum capacity of all uplinks
+        uplink_size = self.context.uplink_size
         atk_flow_set, on_trg, detect = optim_strat.compute(
             [sample], path_data, bw_data, direction_data, uplink_size, feas_strat
         )
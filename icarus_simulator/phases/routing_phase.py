@@ -1,8 +1,10 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
 
 import networkx as nx
-from typing import List, Tuple, Dict
+import numpy as np
+from typing import List, Tuple, Dict, Union, Optional, Iterator, NamedTuple
 
+from icarus_simulator.path_store import PathStore
 from icarus_simulator.phases.base_phase import BasePhase
 from icarus_simulator.strategies.base_strat import BaseStrat
 from icarus_simulator.strategies.routing.base_routing_strat import BaseRoutingStrat
@@ -16,6 +18,23 @@ from icarus_simulator.structure_definitions import (
     LbSet,
 )
 
+# A source grid point, with all the destinations to be routed from it
+SourceGroup = Tuple[int, Tuple[int, ...]]
+
+# Pair-range tasks handed to each process, so that the pair lists are only ever built by the workers
+TASKS_PER_PROC = 4
+
+
+class PairRange(NamedTuple):
+    """
+    Task descriptor for the sources at grid indices [src_start, src_end), each with all the following grid points as
+    destinations. The pairs are expanded lazily from the grid order, one at a time or grouped by source.
+    """
+
+    src_start: int
+    src_end: int
+    grouped: bool
+
 
 class RoutingPhase(BasePhase):
     def __init__(
@@ -32,6 +51,10 @@ class RoutingPhase(BasePhase):
         nw_in: Pname,
         cov_in: Pname,
         paths_out: Pname,
+        group_by_source: bool = False,
+        dedup_coverage: bool = False,
+        dedup_quantum: Optional[float] = None,
+        compact_paths: bool = False,
     ):
         super().__init__(read_persist, persist)
         self.num_procs = num_procs
@@ -40,6 +63,10 @@ class RoutingPhase(BasePhase):
         self.run_jobs = run_jobs
         self.run_server = run_server
         self.rout_strat: BaseRoutingStrat = rout_strat
+        self.group_by_source = group_by_source
+        self.dedup_coverage = dedup_coverage
+        self.dedup_quantum = dedup_quantum
+        self.compact_paths = compact_paths
         self.ins: List[Pname] = [grid_in, nw_in, cov_in]
         self.outs: List[Pname] = [paths_out]
 
@@ -57,23 +84,44 @@ class RoutingPhase(BasePhase):
 
     @property
     def name(self) -> str:
-        return "Routes"
+        # The expanded paths of the coverage classes only approximate the exact routing
+        name = "Routes"
+        if self.dedup_coverage:
+            name += "Dedup" if self.dedup_quantum is None else f"Dedup{self.dedup_quantum}"
+        # The compact results are a PathStore instead of a dict, and are persisted in their own file
+        if self.compact_paths:
+            name += "Compact"
+        return name
 
     def _compute(
         self, grid: GridPos, network: nx.Graph, coverage: Coverage
     ) -> Tuple[PathData]:
-        # Elaborate a list of the sdpairs to be computed
+        # Elaborate the sdpairs to be computed: pair-range tasks, or the representative pairs of the coverage classes
         grid_ids = list(grid.keys())
-        pairs = []
-        for src_key_id in range(len(grid_ids) - 1):
-            in_grid = grid_ids[src_key_id]
-            for dst_key_id in range(src_key_id + 1, len(grid_ids)):
-                out_grid = grid_ids[dst_key_id]
-                pairs.append((in_grid, out_grid))
+        classes = None
+        if self.dedup_coverage:
+            # Route only between the representatives of the coverage classes
+            classes = _coverage_classes(grid_ids, coverage, self.dedup_quantum)
+            pairs = _class_pairs(classes)
+            all_pairs = len(grid_ids) * (len(grid_ids) - 1) // 2
+            print(
+                f"{len(grid_ids)} grid points in {len(classes)} coverage classes, "
+                f"routing {len(pairs)} pairs instead of {all_pairs}, "
+                f"dedup ratio {all_pairs / max(len(pairs), 1):.2f}"
+            )
+            if self.group_by_source:
+                pairs = _group_by_source(pairs)
+        else:
+            # With group_by_source, the workers expand one sample per source, with all its destinations
+            num_tasks = self.num_procs * self.num_batches * TASKS_PER_PROC
+            if self.run_jobs:
+                num_tasks *= self.num_jobs
+            pairs = _pair_ranges(len(grid_ids), num_tasks, self.group_by_source)
+        self.rout_strat.prepare(grid, network, coverage)
         if self.run_jobs:
             job_name = "RouteJob"
             process_params=(grid, network, coverage, self.rout_strat)
-            ret_tuple = (self.initate_jobs(pairs, process_params, job_name),)
+            path_data = self.initate_jobs(pairs, process_params, job_name)
         else:
             # Start a multithreaded computation
             multi = RoutingMultiproc(
@@ -82,8 +130,13 @@ class RoutingPhase(BasePhase):
                 pairs,
                 process_params=(grid, network, coverage, self.rout_strat),
             )
-            ret_tuple = (multi.process_batches(),)  # It must be a tuple!
-        return ret_tuple
+            path_data = multi.process_batches()
+        if classes is not None:
+            path_data = _expand_classes(path_data, classes, grid_ids, coverage)
+        if self.compact_paths:
+            # Array-backed read-only PathData, much lighter to keep in memory, persist and load
+            path_data = PathStore.from_path_data(path_data)
+        return (path_data,)  # It must be a tuple!
 
     def _check_result(self, result: Tuple[PathData]) -> None:
         path_data = result[0]
@@ -94,11 +147,143 @@ class RoutingPhase(BasePhase):
 
 class RoutingMultiproc(Multiprocessor):
     def _single_sample_process(
-        self, sample: SdPair, process_result: Dict[SdPair, LbSet], params: Tuple
+        self,
+        sample: Union[PairRange, SdPair, SourceGroup],
+        process_result: Dict[SdPair, LbSet],
+        params: Tuple,
     ) -> None:
         grid: GridPos
         network: nx.Graph
         coverage: Coverage
         rout_strat: BaseRoutingStrat
         grid, network, coverage, rout_strat = params
-        process_result[sample] = rout_strat.compute(sample, grid, network, coverage)
+        if isinstance(sample, PairRange):
+            for sub_sample in _expand_pair_range(sample, list(grid.keys())):
+                self._single_sample_process(sub_sample, process_result, params)
+        elif isinstance(sample[1], tuple):  # Source-grouped sample
+            process_result.update(
+                rout_strat.compute_source(sample[0], sample[1], grid, network, coverage)
+            )
+        else:
+            process_result[sample] = rout_strat.compute(sample, grid, network, coverage)
+
+
+def _pair_ranges(num_points: int, num_tasks: int, grouped: bool) -> List[PairRange]:
+    """Split the sources in at most num_tasks contiguous ranges with about the same number of pairs."""
+    num_srcs = num_points - 1
+    if num_srcs <= 0:
+        return []
+    num_tasks = max(1, min(num_tasks, num_srcs))
+    # Source i has num_points - 1 - i destinations: cut after the source reaching each fraction of the pairs
+    pairs_upto = np.cumsum(np.arange(num_srcs, 0, -1))
+    targets = pairs_upto[-1] * np.arange(1, num_tasks) / num_tasks
+    cuts = np.searchsorted(pairs_upto, targets) + 1
+    bounds = [0] + sorted(set(cuts.tolist()) - {0, num_srcs}) + [num_srcs]
+    return [PairRange(bounds[i], bounds[i + 1], grouped) for i in range(len(bounds) - 1)]
+
+
+def _expand_pair_range(
+    task: PairRange, grid_ids: List[int]
+) -> Iterator[Union[SdPair, SourceGroup]]:
+    for src_id in range(task.src_start, task.src_end):
+        if task.grouped:
+            yield grid_ids[src_id], tuple(grid_ids[src_id + 1 :])
+        else:
+            for out_grid in grid_ids[src_id + 1 :]:
+                yield grid_ids[src_id], out_grid
+
+
+def _coverage_classes(
+    grid_ids: List[int], coverage: Coverage, quantum: Optional[float]
+) -> List[List[int]]:
+    """
+    Group the grid points covered by the same satellites. If quantum is given, the uplink lengths rounded to multiples
+    of quantum must match as well. Classes and their members follow the grid order, the first member is the
+    representative of the class.
+    """
+    classes: Dict[Tuple, List[int]] = {}
+    for gnd in grid_ids:
+        if quantum is None:
+            signature = tuple(sorted(coverage[gnd]))
+        else:
+            signature = tuple(
+                sorted((sat, round(ln / quantum)) for sat, ln in coverage[gnd].items())
+            )
+        classes.setdefault(signature, []).append(gnd)
+    return list(classes.values())
+
+
+def _class_pairs(classes: List[List[int]]) -> List[SdPair]:
+    """The representative pairs to be routed: one per pair of classes, plus one inside each class of 2+ points."""
+    pairs = []
+    for i, members in enumerate(classes):
+        if len(members) > 1:
+            pairs.append((members[0], members[1]))
+        for other in classes[i + 1 :]:
+            pairs.append((members[0], other[0]))
+    return pairs
+
+
+def _group_by_source(pairs: List[SdPair]) -> List[SourceGroup]:
+    groups: Dict[int, List[int]] = {}
+    for src, dst in pairs:
+        groups.setdefault(src, []).append(dst)
+    return [(src, tuple(dsts)) for src, dsts in groups.items()]
+
+
+def _move_lbset(
+    lbset: LbSet,
+    rep_pair: SdPair,
+    src: int,
+    dst: int,
+    coverage: Coverage,
+    reverse: bool,
+) -> LbSet:
+    """Reuse the satellite part of the representative paths between src and dst, with their own up and downlinks."""
+    if not reverse and (src, dst) == rep_pair:
+        return lbset
+    moved = []
+    for path, length in lbset:
+        sats = path[1:-1]
+        length += (
+            coverage[src][sats[0]]
+            + coverage[dst][sats[-1]]
+            - coverage[rep_pair[0]][sats[0]]
+            - coverage[rep_pair[1]][sats[-1]]
+        )
+        if reverse:
+            moved.append(([-dst] + sats[::-1] + [-src], length))
+        else:
+            moved.append(([-src] + sats + [-dst], length))
+    # The new up and downlinks can change the order of the lengths, keep the shortest path first
+    moved.sort(key=lambda el: el[1])
+    return moved
+
+
+def _expand_classes(
+    rep_data: PathData, classes: List[List[int]], grid_ids: List[int], coverage: Coverage
+) -> PathData:
+    """Expand the paths of the representative pairs to all the ordered pairs of the grid."""
+    order = {gnd: idx for idx, gnd in enumerate(grid_ids)}
+    path_data: PathData = {}
+    for i, members in enumerate(classes):
+        if len(members) > 1:
+            rep_pair = (members[0], members[1])
+            for src_id in range(len(members) - 1):
+                for dst in members[src_id + 1 :]:
+                    path_data[(members[src_id], dst)] = _move_lbset(
+                        rep_data[rep_pair], rep_pair, members[src_id], dst, coverage, False
+                    )
+        for other in classes[i + 1 :]:
+            rep_pair = (members[0], other[0])
+            for src in members:
+                for dst in other:
+                    if order[src] < order[dst]:
+                        path_data[(src, dst)] = _move_lbset(
+                            rep_data[rep_pair], rep_pair, src, dst, coverage, False
+                        )
+                    else:
+                        path_data[(dst, src)] = _move_lbset(
+                            rep_data[rep_pair], rep_pair, src, dst, coverage, True
+                        )
+    return path_data
@@ -30,10 +30,12 @@ class TrafficPhase(BasePhase):
         paths_in: Pname,
         edges_in: Pname,
         bw_out: Pname,
+        aggregate_demands: bool = False,
     ):
         super().__init__(read_persist, persist)
         self.select_strat: BaseBwSelectStrat = select_strat
         self.assign_strat: BaseBwAssignStrat = assign_strat
+        self.aggregate_demands = aggregate_demands
         self.ins: List[Pname] = [grid_in, paths_in, edges_in]
         self.outs: List[Pname] = [bw_out]
 
@@ -51,11 +53,18 @@ class TrafficPhase(BasePhase):
 
     @property
     def name(self) -> str:
-        return "Bw"
+        # The aggregated allocation differs from the quantum one, and is persisted separately
+        return "BwAgg" if self.aggregate_demands else "Bw"
 
     def _compute(
         self, grid_pos: GridPos, path_data: PathData, edge_data: EdgeData
     ) -> Tuple[BwData]:
+        if self.aggregate_demands:
+            # The chosen quanta are aggregated by path, and each demand is allocated at once up to its saturation
+            demands = self.select_strat.compute_demands(grid_pos, path_data)
+            bw_data = self.assign_strat.compute_demands(path_data, demands, edge_data)
+            return (bw_data,)
+
         # Let the selection strategy choose a list of paths to allocate in order
         # Each path in the list bears one single data quantum
         chosen_paths = self.select_strat.compute(grid_pos, path_data)
@@ -3,7 +3,6 @@
 import itertools
 from typing import List, Tuple
 from geopy.distance import great_circle
-import copy
 
 from icarus_simulator.phases.base_phase import BasePhase
 from icarus_simulator.strategies.base_strat import BaseStrat
@@ -13,6 +12,9 @@ from icarus_simulator.strategies.atk_detect_optimisation.base_optim_strat import
 from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
     BaseFeasStrat,
 )
+from icarus_simulator.strategies.atk_feasibility_check.solver_sessions import (
+    worker_session,
+)
 from icarus_simulator.strategies.atk_geo_constraint.base_geo_constraint_strat import (
     BaseGeoConstraintStrat,
 )
@@ -31,7 +33,7 @@ from icarus_simulator.strategies.zone_edges.base_zone_edges_strat import (
 from icarus_simulator.strategies.zone_select.base_zone_select_strat import (
     BaseZoneSelectStrat,
 )
-from icarus_simulator.multiprocessor import Multiprocessor
+from icarus_simulator.attack_multiprocessor import AttackMultiprocessor
 from icarus_simulator.structure_definitions import (
     GridPos,
     Pname,
@@ -165,7 +167,10 @@ class ZoneAttackSpecificPhase(BasePhase):
         return
 
 
-class ZoneAttackMultiproc(Multiprocessor):
+class ZoneAttackMultiproc(AttackMultiprocessor):
+    feas_idx = 4
+    bw_idx = 8
+
     def _single_sample_process(
         self, sample: Tuple[int, int], process_result: ZoneAttackData, params: Tuple
     ) -> None:
@@ -194,8 +199,7 @@ class ZoneAttackMultiproc(Multiprocessor):
             atk_data,
             allowed_sources,
         ) = params
-        feas_strat = copy.deepcopy(feas_strat)
-        feas_strat.empty_enviorment()
+        feas_strat = worker_session(feas_strat)
         # Process the single sample
         zone1, zone2 = build_strat.compute(grid_pos, sample[0], sample[1])
 
@@ -234,9 +238,7 @@ class ZoneAttackMultiproc(Multiprocessor):
             return
 
         # Compute the possible heuristically-determined bottlenecks and check which one is the best
-        uplink_size = max(
-            bw_data[ed].capacity for ed in bw_data if ed[0] == -1
-        )  # Max in case of weird bw assignments
+        uplink_size = self.context.uplink_size
         possible_bnecks = bneck_strat.compute(
             bw_data, atk_data, path_edges, len(cross_zone_paths)
         )
@@ -22,5 +22,7 @@
 
 from .constellation import Constellation
 from .constellation_network import ConstellationNetwork, WalkerConstellationNetwork
+from .isl_topology import IslTopology
 from .orbit_shift_algo import WalkerShift, OrbitShiftAlgo, SimpleShift, NoShift
+from .propagator import ConstellationPropagator
 from .satellite import Satellite
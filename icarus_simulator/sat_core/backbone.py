@@ -0,0 +1,90 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+All-pairs shortest paths between the satellites of a constellation network.
+Every ground-to-ground route crosses the same ISL graph: the satellite-to-satellite distances and predecessors are
+therefore computed once, and a ground pair only has to pick the best combination of uplink, backbone and downlink.
+The matrices are stored as float32 and int32, and can be saved and loaded memory-mapped.
+"""
+import os
+from typing import Dict, List, Optional
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+DIST_FILE = "backbone_dist.npy"
+PRED_FILE = "backbone_pred.npy"
+
+
+class SatBackbone:
+    """Distance and predecessor matrices of the shortest paths among all satellites."""
+
+    def __init__(self, dist: np.ndarray, pred: np.ndarray) -> None:
+        """
+        Args:
+            dist: (N, N) float32 matrix, dist[i, j] is the length of the shortest path from i to j.
+            pred: (N, N) int32 matrix, pred[i, j] is the node before j on the shortest path from i to j.
+        """
+        self.dist = dist
+        self.pred = pred
+        self.num_sats = dist.shape[0]
+
+    @staticmethod
+    def from_network(network: nx.Graph) -> "SatBackbone":
+        """Compute the backbone of a satellite network, whose edges have the `length` attribute."""
+        num_sats = max(network.nodes) + 1
+        edges = [(s1, s2, ln) for s1, s2, ln in network.edges(data="length")]
+        rows = np.array([ed[0] for ed in edges], dtype=np.int32)
+        cols = np.array([ed[1] for ed in edges], dtype=np.int32)
+        lengths = np.array([ed[2] for ed in edges], dtype=np.float64)
+        matrix = csr_matrix((lengths, (rows, cols)), shape=(num_sats, num_sats))
+        dist, pred = dijkstra(matrix, directed=False, return_predecessors=True)
+        return SatBackbone(dist.astype(np.float32), pred.astype(np.int32))
+
+    def save(self, dirname: str) -> None:
+        np.save(os.path.join(dirname, DIST_FILE), self.dist)
+        np.save(os.path.join(dirname, PRED_FILE), self.pred)
+
+    @staticmethod
+    def load(dirname: str, mmap_mode: Optional[str] = "r") -> "SatBackbone":
+        """Load a saved backbone. By default, the matrices are memory-mapped read-only."""
+        dist = np.load(os.path.join(dirname, DIST_FILE), mmap_mode=mmap_mode)
+        pred = np.load(os.path.join(dirname, PRED_FILE), mmap_mode=mmap_mode)
+        return SatBackbone(dist, pred)
+
+    def sat_path(self, src_sat: int, dst_sat: int) -> List[int]:
+        """Rebuild the shortest path between two satellites from the predecessors."""
+        pred_row = self.pred[src_sat]
+        path = [dst_sat]
+        while path[-1] != src_sat:
+            path.append(int(pred_row[path[-1]]))
+        path.reverse()
+        return path
+
+    def best_ground_route(
+        self, uplinks: Dict[int, float], downlinks: Dict[int, float]
+    ) -> Optional[List[int]]:
+        """
+        Find the shortest uplink + backbone + downlink combination.
+        Args:
+            uplinks: The satellites covering the source, with the uplink lengths.
+            downlinks: The satellites covering the destination, with the downlink lengths.
+
+        Returns:
+            Optional[List[int]]: The satellite path, or None if no satellite combination is connected.
+        """
+        if len(uplinks) == 0 or len(downlinks) == 0:
+            return None
+        up_sats = np.fromiter(uplinks.keys(), dtype=np.int64, count=len(uplinks))
+        dwn_sats = np.fromiter(downlinks.keys(), dtype=np.int64, count=len(downlinks))
+        up_lens = np.fromiter(uplinks.values(), dtype=np.float64, count=len(uplinks))
+        dwn_lens = np.fromiter(downlinks.values(), dtype=np.float64, count=len(downlinks))
+        totals = self.dist[np.ix_(up_sats, dwn_sats)] + up_lens[:, None] + dwn_lens
+        best = np.argmin(totals)
+        if not np.isfinite(totals.flat[best]):
+            return None
+        up_idx, dwn_idx = np.unravel_index(best, totals.shape)
+        src_sat, dst_sat = int(up_sats[up_idx]), int(dwn_sats[dwn_idx])
+        return self.sat_path(src_sat, dst_sat)
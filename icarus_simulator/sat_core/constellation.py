@@ -6,6 +6,7 @@ import numpy as np
 
 from .orbit_shift_algo import OrbitShiftAlgo
 from .orbit_util import elevation_to_mean_motion, epoch_offset_to_date
+from .propagator import ConstellationPropagator
 from .satellite import Satellite
 from icarus_simulator.sat_core.coordinate_util import GeodeticPosition
 
@@ -27,6 +28,7 @@ class Constellation:
         orbit_shift_algo: OrbitShiftAlgo = None,
         eccentricity: float = 1e-32,
         aug_perigee: float = 0.0,
+        propagator: str = "ephem",
     ) -> None:
         self.num_sat_per_orbit = num_sat_per_orbit
         self.num_orbits = num_orbits
@@ -45,6 +47,11 @@ class Constellation:
                 assert np.isclose(mean_motion, conv_mean_motion)
             mean_motion = conv_mean_motion
         self.mean_motion = mean_motion
+        # Propagation engine: "ephem" computes each Satellite, "numpy" the whole constellation at once
+        if propagator not in ("ephem", "numpy"):
+            raise ValueError("Specify a valid propagator: 'ephem' or 'numpy'")
+        self.propagator = propagator
+        self.vect_propagator: ConstellationPropagator = None
         # Satellite store
         self.satellites: Dict[int, Satellite] = {}
 
@@ -69,6 +76,10 @@ class Constellation:
                     aug_perigee=self.aug_perigee,
                 )
                 self.satellites[cur_sat.sat_idx] = cur_sat
+        if self.propagator == "numpy":
+            self.vect_propagator = ConstellationPropagator.from_satellites(
+                self.satellites
+            )
 
     def compute_positions_at_time(self, timestr: str) -> Dict[int, GeodeticPosition]:
         """
@@ -81,6 +92,14 @@ class Constellation:
             Dict[int, SatPosition]: A dictionary of satellite positions, keyed
                 by satellite index.
         """
+        if self.propagator == "numpy":
+            lat, lon, elev = (
+                arr.tolist() for arr in self.vect_propagator.positions_at_time(timestr)
+            )
+            return {
+                idx: {"lat": lat[idx], "lon": lon[idx], "elev": elev[idx]}
+                for idx in range(len(self.satellites))
+            }
         positions = {}
         for idx, satellite in self.satellites.items():
             positions[idx] = satellite.position_at_time(timestr)
@@ -106,6 +125,25 @@ class Constellation:
         )
         return self.compute_positions_at_time(target_date_str)
 
+    def compute_positions_at_epoch_offsets(self, offsets: np.ndarray) -> np.ndarray:
+        """
+        Compute satellite positions for a whole series of epoch offsets
+        Args:
+            offsets: Array of T offsets from epoch, in seconds.
+
+        Returns: np.ndarray: Array of shape (T, N, 3), where the entry [t, idx]
+                holds the lat, lon and elev of satellite idx at offset t.
+        """
+        offsets = np.asarray(offsets, dtype=float).reshape(-1)
+        if self.propagator == "numpy":
+            return self.vect_propagator.positions_at_epoch_offsets(offsets)
+        positions = np.empty((offsets.shape[0], len(self.satellites), 3))
+        for t, offset in enumerate(offsets):
+            target_date_str = epoch_offset_to_date(self.epoch, seconds=float(offset))
+            for idx, pos in self.compute_positions_at_time(target_date_str).items():
+                positions[t, idx] = pos["lat"], pos["lon"], pos["elev"]
+        return positions
+
     def positions_tostring(self) -> List[str]:
         """
         List of strings with index and position information.
@@ -4,9 +4,11 @@
 from typing import List, Tuple, Dict
 from typing_extensions import TypedDict
 import networkx as nx
+import numpy as np
 
 from .constellation import Constellation
-from .isl_util import sat_idx_to_in_orbit_idx, compute_link_length, get_sat_by_offset
+from .isl_topology import IslTopology
+from .isl_util import compute_link_lengths
 from .orbit_shift_algo import WalkerShift
 from .coordinate_util import GeodeticPosition
 
@@ -32,6 +34,7 @@ class ConstellationNetwork:
         self.num_orbits = num_orbits
         self.network: nx.Graph = nx.Graph()
         self.max_shift = max_shift
+        self.topology: IslTopology = None
 
     def generate_network(self, motif):
         """
@@ -40,24 +43,22 @@ class ConstellationNetwork:
                 contains two indices, representing the offset from the current
                 satellite.
         """
-        for sat_idx in self.sat_pos:
-            sat_idx_in_orbit, orbit_idx = sat_idx_to_in_orbit_idx(
-                sat_idx, self.num_sat_per_orbit
-            )
-            for sat_off, orbit_off in motif:
-                neigh_idx, _, _ = get_sat_by_offset(
-                    sat_idx_in_orbit,
-                    orbit_idx,
-                    sat_off,
-                    orbit_off,
-                    self.num_sat_per_orbit,
-                    self.num_orbits,
-                    self.max_shift,
-                )
-                length = compute_link_length(
-                    self.sat_pos[sat_idx], self.sat_pos[neigh_idx]
-                )
-                self.network.add_edge(sat_idx, neigh_idx, length=length)
+        # The topology is computed once, the link lengths are computed in a single vectorised pass
+        self.topology = IslTopology(
+            motif, self.num_sat_per_orbit, self.num_orbits, self.max_shift
+        )
+        self.topology.update_lengths_from_dict(self.sat_pos)
+        self.network = self.topology.to_graph()
+
+    def update_positions(self, sat_pos: Dict[int, GeodeticPosition]):
+        """
+        Move the satellites of a generated network, updating the ISL lengths in place.
+        Args:
+            sat_pos: The new satellite positions.
+        """
+        self.sat_pos = sat_pos
+        self.topology.update_lengths_from_dict(sat_pos)
+        self.topology.update_graph(self.network)
 
     def get_sats(self):
         return self.sat_pos.copy()
@@ -101,6 +102,7 @@ class WalkerConstellationNetwork:
         mean_motion: float = None,
         elevation: float = None,
         motif: List[Tuple[int, int]] = ((0, 1), (1, 0)),
+        propagator: str = "ephem",
     ) -> None:
         self.shiftalgo = WalkerShift(
             inclination, num_sat_per_orbit, num_orbits, f_param
@@ -114,6 +116,7 @@ class WalkerConstellationNetwork:
             mean_motion=mean_motion,
             elevation=elevation,
             orbit_shift_algo=self.shiftalgo,
+            propagator=propagator,
         )
         self.const.create_constellation()
         sat_pos = self.const.compute_positions_at_epoch_offset()
@@ -131,11 +134,26 @@ class WalkerConstellationNetwork:
     def compute_network_at_epoch_offset(
         self, hours=0, minutes=0, seconds=0, millisecs=0
     ):
-        # TODO: Improve this integration
+        # The motif topology does not change: only the ISL lengths of the network are updated
         sat_pos = self.const.compute_positions_at_epoch_offset(
             hours, minutes, seconds, millisecs
         )
-        self.cnet = ConstellationNetwork(
-            sat_pos, self.num_sat_per_orbit, self.num_orbits, max_shift=self.max_shift
-        )
-        self.cnet.generate_network(self.motif)
+        self.cnet.update_positions(sat_pos)
+
+    def compute_networks_at_epoch_offsets(
+        self, offsets: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the constellation geometry for a whole series of epoch offsets.
+        The motif topology does not change over time, only the lengths do.
+        Args:
+            offsets: Array of T offsets from epoch, in seconds.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: the (T, N, 3) lat, lon,
+                elev position tensor, the (E, 2) satellite indices of the ISLs
+                and the (T, E) lengths of each ISL at each offset.
+        """
+        positions = self.const.compute_positions_at_epoch_offsets(offsets)
+        isls = self.cnet.topology.isls
+        return positions, isls, compute_link_lengths(positions, isls)
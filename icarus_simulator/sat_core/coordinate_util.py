@@ -6,7 +6,7 @@ This file contains the type definitions and conversions between coordinate schem
 All length values in m
 """
 import numpy as np
-from typing import Tuple
+from typing import Tuple, Dict
 from typing_extensions import TypedDict
 
 from icarus_simulator.sat_core.planetary_const import EARTH_RADIUS
@@ -47,3 +47,42 @@ def geo2cart(geo_coord: GeodeticPosition) -> CartCoords:
 
     assert rad >= EARTH_RADIUS - 1000  # Allow for approximation error
     return cart
+
+
+def geo2cart_array(geo_coords: np.ndarray) -> np.ndarray:
+    """
+    Vectorised version of `geo2cart`.
+    Args:
+        geo_coords: Array of shape (..., 3), holding lat and lon in degrees and
+            elev in meters in the last dimension.
+
+    Returns:
+        np.ndarray: Array of shape (..., 3) of cartesian (x, y, z) coordinates.
+    """
+    theta = np.deg2rad(geo_coords[..., 1])
+    phi = np.deg2rad(90 - geo_coords[..., 0])
+    r = geo_coords[..., 2] + EARTH_RADIUS
+    cart = np.empty(geo_coords.shape)
+    cart[..., 0] = r * np.sin(phi) * np.cos(theta)
+    cart[..., 1] = r * np.sin(phi) * np.sin(theta)
+    cart[..., 2] = r * np.cos(phi)
+
+    assert np.all(r >= EARTH_RADIUS - 1000)  # Allow for approximation error
+    return cart
+
+
+def geo_dict_to_array(geo_coords: Dict[int, GeodeticPosition], size: int) -> np.ndarray:
+    """
+    Stack indexed {lat, long, elevation} points in an array.
+    Args:
+        geo_coords: Positions keyed by the indices 0, ..., size-1.
+        size: Number of positions.
+
+    Returns:
+        np.ndarray: Array of shape (size, 3), row i holds lat, lon, elev of point i.
+    """
+    arr = np.empty((size, 3))
+    for idx in range(size):
+        pos = geo_coords[idx]
+        arr[idx] = pos["lat"], pos["lon"], pos["elev"]
+    return arr
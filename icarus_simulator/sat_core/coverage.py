@@ -5,10 +5,12 @@ from typing import Dict, Tuple
 import pandas as pd
 import networkx as nx
 import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
 from sklearn.neighbors import KDTree
 
-from .coordinate_util import GeodeticPosition, geo2cart
+from .coordinate_util import GeodeticPosition, geo2cart_array
 from .isl_util import max_ground_sat_dist, compute_link_length
+from icarus_simulator.utils import LastValueCache
 
 WUP_CITIES = "data/WUP2018-F22-Cities_Over_300K_Annual.csv"
 
@@ -64,6 +66,89 @@ def add_cities_to_graph(G: nx.Graph, coverage: Dict[int, Dict[int, float]]):
     return G
 
 
+def _stack_positions(positions: Dict[int, GeodeticPosition]) -> Tuple[np.ndarray, np.ndarray]:
+    """Split indexed positions in an (N,) array of indices and an (N, 3) array of lat, lon, elev."""
+    ids = np.fromiter(positions.keys(), dtype=np.int64, count=len(positions))
+    geo = np.empty((len(positions), 3))
+    for row, pos in enumerate(positions.values()):
+        geo[row] = pos["lat"], pos["lon"], pos["elev"]
+    return ids, geo
+
+
+class CoverageEngine:
+    """
+    Satellite coverage of a fixed set of ground points.
+    The KD-tree of the ground points is built once, and then queried with the positions of every snapshot.
+    """
+
+    def __init__(self, grid_pos: Dict[int, GeodeticPosition]) -> None:
+        self.grid_ids, self.grid_geo = _stack_positions(grid_pos)
+        self.kd = KDTree(geo2cart_array(self.grid_geo))
+
+    def matches(self, grid_pos: Dict[int, GeodeticPosition]) -> bool:
+        """Check if the engine was built for exactly these ground points."""
+        # The points are always compared, as the same grid object can be changed in place between two calls. The
+        # engine only keeps their arrays, not the grid
+        if len(grid_pos) != self.grid_ids.size:
+            return False
+        grid_ids, grid_geo = _stack_positions(grid_pos)
+        return np.array_equal(grid_ids, self.grid_ids) and np.array_equal(
+            grid_geo, self.grid_geo
+        )
+
+    def distance_matrix(self, sat_geo: np.ndarray, min_elev_angle: float) -> csr_matrix:
+        """
+        Compute the distances between the ground points and the satellites that cover them.
+        Args:
+            sat_geo: Array of shape (S, 3) of satellite lat, lon, elev.
+            min_elev_angle: Minimum elevation angle of the satellites
+
+        Returns:
+            csr_matrix: (G, S) matrix, row i holds the distances of ground point grid_ids[i] from all the satellites
+                covering it. Rows and columns follow the order of grid_ids and sat_geo.
+        """
+        num_sats = sat_geo.shape[0]
+        shape = (self.grid_ids.size, num_sats)
+        if num_sats == 0:
+            return csr_matrix(shape)
+        max_dists = max_ground_sat_dist(sat_geo[:, 2], min_elev_angle)
+        covered, distances = self.kd.query_radius(
+            geo2cart_array(sat_geo), r=max_dists, return_distance=True
+        )
+        counts = np.fromiter(map(len, covered), dtype=np.int64, count=num_sats)
+        rows = np.concatenate(covered)
+        cols = np.repeat(np.arange(num_sats), counts)
+        return coo_matrix((np.concatenate(distances), (rows, cols)), shape=shape).tocsr()
+
+    def to_coverage(
+        self, matrix: csr_matrix, sat_ids: np.ndarray
+    ) -> Dict[int, Dict[int, float]]:
+        """
+        Convert a distance matrix to the {ground_idx:{sat_idx: dist}} format.
+        Args:
+            matrix: Matrix returned by `distance_matrix`.
+            sat_ids: (S,) array, the satellite index of each column.
+
+        Returns: All the distances {ground_idx:{sat_idx: dist}}
+        """
+        indptr = matrix.indptr.tolist()
+        sats = sat_ids[matrix.indices].tolist()
+        dists = matrix.data.tolist()
+        all_dist = {}
+        for row, grid_idx in enumerate(self.grid_ids.tolist()):
+            start, end = indptr[row], indptr[row + 1]
+            all_dist[grid_idx] = dict(zip(sats[start:end], dists[start:end]))
+        return all_dist
+
+
+_engine_cache = LastValueCache(CoverageEngine, matches=CoverageEngine.matches)
+
+
+def get_coverage_engine(grid_pos: Dict[int, GeodeticPosition]) -> CoverageEngine:
+    """Return the engine of the last ground grid, building a new one only if the grid changed."""
+    return _engine_cache.get(grid_pos)
+
+
 def positions_satellite_coverage(
     grid_pos: Dict[int, GeodeticPosition],
     sat_pos: Dict[int, GeodeticPosition],
@@ -81,26 +166,6 @@ def positions_satellite_coverage(
 
     Returns: All the distances {ground_idx:{sat_idx: dist}}
     """
-    all_dist = {idx: {} for idx in grid_pos}
-    # The dictionary format we use conflicts with this algorithm's format -> index map
-    # Put grid points into a KD-tree
-    index, id_map, grid_cart = 0, {}, np.zeros((len(grid_pos), 3))
-    for grid_id in grid_pos:
-        id_map[index] = grid_id  # map indices to sat indices
-        grid_cart[index] = geo2cart(grid_pos[grid_id])
-        index += 1
-    kd = KDTree(grid_cart)
-
-    # Query all the satellites using the max_dist
-    for sat_idx, sat in sat_pos.items():
-        max_dist = max_ground_sat_dist(sat["elev"], min_elev_angle)
-        covered_grid_ids, distances = kd.query_radius(
-            [geo2cart(sat)], r=max_dist, count_only=False, return_distance=True
-        )
-        covered_grid_ids = covered_grid_ids[0]
-        distances = distances[0]
-        # Convert all the indices back
-        for i in range(len(distances)):
-            grid_idx = id_map[covered_grid_ids[i]]
-            all_dist[grid_idx][sat_idx] = distances[i]
-    return all_dist
+    engine = get_coverage_engine(grid_pos)
+    sat_ids, sat_geo = _stack_positions(sat_pos)
+    return engine.to_coverage(engine.distance_matrix(sat_geo, min_elev_angle), sat_ids)
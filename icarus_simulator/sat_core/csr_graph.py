@@ -0,0 +1,46 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+Integer-indexed CSR copy of a satellite network, shared by the routing engines.
+The all-pairs satellite distances are computed once per network: the exact distance from every satellite to a
+destination ground point is then a vectorised minimum over the satellites covering it. Removing or masking edges can
+only make paths longer, so these distances are a consistent A* heuristic for any search on a modified network.
+"""
+from typing import Dict, List
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+
+class SatCsrGraph:
+    """CSR adjacency of a satellite network, with its all-pairs shortest distances."""
+
+    def __init__(self, network: nx.Graph) -> None:
+        self.network = network
+        self.num_sats = max(network.nodes) + 1
+        # Neighbours in the network's own order, so that equal-length choices follow networkx' ones when possible
+        self.indptr: List[int] = [0]
+        self.indices: List[int] = []
+        self.weights: List[float] = []
+        for sat in range(self.num_sats):
+            for nbr, attr in network._adj.get(sat, {}).items():
+                self.indices.append(nbr)
+                self.weights.append(attr["length"])
+            self.indptr.append(len(self.indices))
+        matrix = csr_matrix(
+            (
+                np.array(self.weights),
+                np.array(self.indices, dtype=np.int32),
+                np.array(self.indptr),
+            ),
+            shape=(self.num_sats, self.num_sats),
+        )
+        self.dist = dijkstra(matrix, directed=False)
+
+    def distances_to(self, downlinks: Dict[int, float]) -> List[float]:
+        """Shortest distance from every satellite to a ground point, through one of its downlinks."""
+        down_sats = np.fromiter(downlinks.keys(), dtype=np.int64, count=len(downlinks))
+        down_lens = np.fromiter(downlinks.values(), dtype=np.float64, count=len(downlinks))
+        return np.min(self.dist[:, down_sats] + down_lens, axis=1).tolist()
@@ -0,0 +1,161 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+ESX (edge-subset exclusion) k shortest dissimilar paths, on an integer-indexed CSR copy of the satellite network.
+Each chosen path keeps its directed edges as a set of integer ids, with their lengths, so that the similarity of a
+candidate with all the chosen paths is a set intersection. Similarities are computed once per candidate. Edges are
+excluded by masking the CSR weight array in place, restored before returning, and every repeated search is an A*
+pruned with the length cutoff.
+"""
+from heapq import heapify, heappop, heappush
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+
+from .csr_graph import SatCsrGraph
+
+# Relative slack of the pruning bound, so that rounding errors never discard a path at the cutoff
+PRUNE_SLACK = 1 + 1e-9
+
+
+class _EsxPath:
+    def __init__(self, nodes: List[int], length: float, edge_ids: List[int], edge_lens: List[float]):
+        self.nodes = nodes
+        self.length = length
+        self.edges = dict(zip(edge_ids, edge_lens))
+        self.edge_lens = edge_lens
+        self.heap: List[Tuple[float, Tuple[int, int]]] = []
+
+    def similarity(self, other: "_EsxPath") -> float:
+        common = self.edges.keys() & other.edges.keys()
+        return sum(self.edges[ed] for ed in common) / min(self.length, other.length)
+
+    def fill_heap(self) -> None:
+        # The satellite edges of the path, excluding up and downlinks, shortest first
+        nodes = self.nodes
+        self.heap = [(ln, (nodes[i], nodes[i + 1])) for i, ln in enumerate(self.edge_lens)][1:-1]
+        heapify(self.heap)
+
+
+class EsxEngine(SatCsrGraph):
+    """k shortest paths with limited overlap on a fixed satellite network, between two virtual ground nodes."""
+
+    def __init__(self, network: nx.Graph) -> None:
+        super().__init__(network)
+        self.base_weights = list(self.weights)
+        self.pos_of: Dict[Tuple[int, int], int] = {}
+        for sat in range(self.num_sats):
+            for pos in range(self.indptr[sat], self.indptr[sat + 1]):
+                self.pos_of[(sat, self.indices[pos])] = pos
+
+    def esx(
+        self,
+        uplinks: Dict[int, float],
+        downlinks: Dict[int, float],
+        k: int,
+        theta: float,
+        cutoff: float,
+    ) -> List[Tuple[List[int], float]]:
+        """
+        Compute up to k paths no longer than cutoff, whose pairwise similarity is at most theta.
+        The similarity of two paths is the length of their common edges over the length of the shorter one.
+        Args:
+            uplinks: The satellites covering the source, with the uplink lengths.
+            downlinks: The satellites covering the destination, with the downlink lengths.
+            k: Maximum number of paths.
+            theta: Similarity threshold.
+            cutoff: Maximum path length.
+
+        Returns:
+            List[Tuple[List[int], float]]: The satellite part of each path, and the path length including the up and
+                downlinks.
+        """
+        if k <= 0 or len(uplinks) == 0 or len(downlinks) == 0:
+            return []
+        num_sats, nnz = self.num_sats, len(self.indices)
+        src, dst = num_sats, num_sats + 1
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        to_dst = self.distances_to(downlinks)
+        to_dst.append(min(ln + to_dst[sat] for sat, ln in uplinks.items()))  # src
+        to_dst.append(0.0)  # dst
+        bound = cutoff * PRUNE_SLACK
+
+        def search() -> Optional[_EsxPath]:
+            # A* from src to dst on the masked weights. Edge ids: CSR position, nnz + sat for the uplink to sat,
+            # nnz + num_sats + sat for the downlink from sat
+            dists, preds, done = {src: 0.0}, {src: (None, None, None)}, set()
+            heap = [(to_dst[src], 0.0, src)]
+            while heap:
+                _, g, node = heappop(heap)
+                if node in done:
+                    continue
+                if node == dst:
+                    nodes, edge_ids, edge_lens = [node], [], []
+                    while preds[nodes[-1]][0] is not None:
+                        prev, eid, ln = preds[nodes[-1]]
+                        nodes.append(prev)
+                        edge_ids.append(eid)
+                        edge_lens.append(ln)
+                    nodes.reverse()
+                    edge_ids.reverse()
+                    edge_lens.reverse()
+                    return _EsxPath(nodes, g, edge_ids, edge_lens)
+                done.add(node)
+                if node == src:
+                    edges = [(sat, ln, nnz + sat) for sat, ln in uplinks.items()]
+                else:
+                    edges = [(indices[pos], weights[pos], pos) for pos in range(indptr[node], indptr[node + 1])]
+                    if node in downlinks:
+                        edges.append((dst, downlinks[node], nnz + num_sats + node))
+                for nbr, ln, eid in edges:
+                    if nbr in done:
+                        continue
+                    new_g = g + ln
+                    if new_g + to_dst[nbr] > bound:
+                        continue
+                    if new_g < dists.get(nbr, float("inf")):
+                        dists[nbr] = new_g
+                        preds[nbr] = (node, eid, ln)
+                        heappush(heap, (new_g + to_dst[nbr], new_g, nbr))
+            return None
+
+        masked = {}
+        try:
+            p_c = search()
+            if p_c is None:
+                return []
+            p_c.fill_heap()
+            chosen, sims = [p_c], [1.0]
+            while len(chosen) < k and any(len(ch.heap) > 0 for ch in chosen):
+                # Similarities only change with p_c: all its edges are unmasked, as it was found after the last mask
+                if sims is None:
+                    sims = [p_c.similarity(ch) for ch in chosen]
+                sim_values = [(sims[idx], len(ch.heap), idx) for idx, ch in enumerate(chosen)]
+                if all(sv[0] <= theta for sv in sim_values):
+                    p_c.fill_heap()
+                    chosen.append(p_c)
+                    sims.append(1.0)
+                    sim_values.append((1.0, len(p_c.heap), len(chosen) - 1))
+
+                # Make p_c more dissimilar from the most similar path with edges left, excluding its shortest edge
+                sim_values.sort(key=lambda sv: sv[0], reverse=True)
+                most_similar = chosen[next(sv[2] for sv in sim_values if sv[1] > 0)]
+                top_ed = heappop(most_similar.heap)[1]
+                ord_top = (min(top_ed), max(top_ed))
+                if ord_top in masked:
+                    continue
+                pos = self.pos_of[top_ed]
+                rev_pos = self.pos_of[(top_ed[1], top_ed[0])]
+                masked[ord_top] = (pos, rev_pos)
+                weights[pos] = weights[rev_pos] = float("inf")
+
+                # Masking never disconnects the graph: no path means that all the remaining ones are too long
+                new_p_c = search()
+                if new_p_c is None:
+                    break
+                p_c, sims = new_p_c, None
+        finally:
+            for pos, rev_pos in masked.values():
+                weights[pos] = self.base_weights[pos]
+                weights[rev_pos] = self.base_weights[rev_pos]
+        return [(ch.nodes[1:-1], ch.length) for ch in chosen]
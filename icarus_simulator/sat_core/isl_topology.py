@@ -0,0 +1,92 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+Fixed Inter-Satellite Link topology of a motif-interconnected constellation.
+The links created by a motif never change between snapshots, only their lengths do: the adjacency is therefore built
+once, in CSR form, and only the weight arrays are rewritten when the satellites move.
+"""
+from typing import Dict, List, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .coordinate_util import GeodeticPosition, geo_dict_to_array, geo2cart_array
+from .isl_util import motif_isls
+
+# Graph attribute holding the (N, 3) cartesian satellite positions, used by the geometric routing searches
+SAT_CART = "sat_cart"
+
+
+class IslTopology:
+    """CSR adjacency of the ISLs, with per-link lengths updated in place."""
+
+    def __init__(
+        self,
+        motif: List[Tuple[int, int]],
+        num_sat_per_orbit: int,
+        num_orbits: int,
+        max_shift: float = 0,
+    ) -> None:
+        """
+        Args:
+            motif: The description of a motif. A list of tuples. Each tuple
+                contains two indices, representing the offset from the current
+                satellite.
+            num_sat_per_orbit: Total number of satellites in each orbit of the
+                constellation.
+            num_orbits: Number of orbits in the constellation.
+            max_shift: Maximum shift introduced by OrbitShiftAlgo or other means.
+        """
+        self.num_sats = num_sat_per_orbit * num_orbits
+        # isls[j] holds the satellites of link j, lengths[j] its current length
+        self.isls = motif_isls(motif, num_sat_per_orbit, num_orbits, max_shift)
+        self.lengths = np.zeros(self.isls.shape[0])
+        self.cart = np.zeros((self.num_sats, 3))
+
+        # Symmetric adjacency: each link appears in the rows of both satellites
+        rows = np.concatenate((self.isls[:, 0], self.isls[:, 1]))
+        cols = np.concatenate((self.isls[:, 1], self.isls[:, 0]))
+        isl_ids = np.concatenate((np.arange(len(self.isls)),) * 2)
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(self.num_sats + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=self.num_sats), out=indptr[1:])
+        # csr_isl_ids[k] is the link stored in the k-th entry of the CSR arrays
+        self.csr_isl_ids = isl_ids[order]
+        self.matrix = csr_matrix(
+            (np.zeros(len(order)), cols[order].astype(np.int32), indptr),
+            shape=(self.num_sats, self.num_sats),
+        )
+
+    def update_lengths(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Recompute the length of all links, rewriting the weights in place.
+        Args:
+            positions: Array of shape (N, 3) of satellite lat, lon, elev.
+
+        Returns:
+            np.ndarray: The (E,) array of link lengths, indexed as `isls`.
+        """
+        self.cart = geo2cart_array(positions)
+        diff = self.cart[self.isls[:, 0]] - self.cart[self.isls[:, 1]]
+        self.lengths[:] = np.sqrt(np.sum(np.square(diff), axis=-1))
+        self.matrix.data[:] = self.lengths[self.csr_isl_ids]
+        return self.lengths
+
+    def update_lengths_from_dict(self, sat_pos: Dict[int, GeodeticPosition]) -> np.ndarray:
+        """Same as `update_lengths`, for positions keyed by satellite index."""
+        return self.update_lengths(geo_dict_to_array(sat_pos, self.num_sats))
+
+    def to_graph(self) -> nx.Graph:
+        """Build a networkx graph of the links, with the current lengths and satellite positions."""
+        network = nx.Graph()
+        for (sat1, sat2), length in zip(self.isls.tolist(), self.lengths.tolist()):
+            network.add_edge(sat1, sat2, length=length)
+        network.graph[SAT_CART] = self.cart
+        return network
+
+    def update_graph(self, network: nx.Graph) -> None:
+        """Write the current lengths in the edges of a graph built with `to_graph`."""
+        for (sat1, sat2), length in zip(self.isls.tolist(), self.lengths.tolist()):
+            network[sat1][sat2]["length"] = length
+        network.graph[SAT_CART] = self.cart
@@ -1,12 +1,12 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
 
 
-from typing import Tuple
+from typing import Tuple, List
 
 import numpy as np
 from scipy.spatial.distance import euclidean
 
-from .coordinate_util import GeodeticPosition, geo2cart
+from .coordinate_util import GeodeticPosition, geo2cart, geo2cart_array
 from .planetary_const import *
 
 
@@ -24,6 +24,64 @@ def compute_link_length(sat1: GeodeticPosition, sat2: GeodeticPosition) -> float
     return euclidean(cart1, cart2)
 
 
+def compute_link_lengths(geo_positions: np.ndarray, isls: np.ndarray) -> np.ndarray:
+    """
+    Vectorised computation of the length of many Inter-Satellite Links
+    Args:
+        geo_positions: Array of shape (..., N, 3) of satellite lat, lon, elev.
+        isls: Array of shape (E, 2) of satellite indices, one row per link.
+    Returns:
+        Array of shape (..., E) of the Euclidean distances between the points
+    """
+    cart = geo2cart_array(geo_positions)
+    diff = cart[..., isls[:, 0], :] - cart[..., isls[:, 1], :]
+    return np.sqrt(np.sum(np.square(diff), axis=-1))
+
+
+def motif_isls(
+    motif: List[Tuple[int, int]],
+    num_sat_per_orbit: int,
+    num_orbits: int,
+    max_shift: float = 0,
+) -> np.ndarray:
+    """Compute the Inter-Satellite Links created by a motif.
+
+    Args:
+        motif: The description of a motif. A list of tuples. Each tuple
+            contains two indices, representing the offset from the current
+            satellite.
+        num_sat_per_orbit: Total number of satellites in each orbit of the
+                constellation.
+        num_orbits: Number of orbits in the constellation.
+        max_shift: Maximum shift introduced by OrbitShiftAlgo or other means.
+
+    Returns:
+        np.ndarray: Array of shape (E, 2) with the satellite indices of each
+            link, in the order in which `ConstellationNetwork` creates them.
+            Each undirected link appears once.
+    """
+    isls, seen = [], set()
+    for sat_idx in range(num_sat_per_orbit * num_orbits):
+        sat_idx_in_orbit, orbit_idx = sat_idx_to_in_orbit_idx(
+            sat_idx, num_sat_per_orbit
+        )
+        for sat_off, orbit_off in motif:
+            neigh_idx, _, _ = get_sat_by_offset(
+                sat_idx_in_orbit,
+                orbit_idx,
+                sat_off,
+                orbit_off,
+                num_sat_per_orbit,
+                num_orbits,
+                max_shift,
+            )
+            ord_isl = (min(sat_idx, neigh_idx), max(sat_idx, neigh_idx))
+            if ord_isl not in seen:
+                seen.add(ord_isl)
+                isls.append((sat_idx, neigh_idx))
+    return np.array(isls, dtype=int).reshape(-1, 2)
+
+
 def get_sat_by_offset(
     sat_idx_in_orbit: int,
     orbit_idx: int,
@@ -0,0 +1,139 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+Yen's k shortest simple paths between two ground points, on an integer-indexed CSR copy of the satellite network.
+The distances to the destination in the unmodified network are the A* heuristic of all the spur searches, whose
+removed nodes and edges can only make paths longer. Spur searches are also pruned with the length cutoff, so that
+candidates longer than the cutoff are never built.
+"""
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Set, Tuple
+
+import networkx as nx
+
+from .csr_graph import SatCsrGraph
+
+# Relative slack of the pruning bounds, so that rounding errors never discard a path at the cutoff
+PRUNE_SLACK = 1 + 1e-9
+
+
+class KspEngine(SatCsrGraph):
+    """k shortest simple paths on a fixed satellite network, with virtual source and destination ground nodes."""
+
+    def __init__(self, network: nx.Graph) -> None:
+        super().__init__(network)
+        ptr = self.indptr
+        self.neighbours: List[List[Tuple[int, float]]] = [
+            list(zip(self.indices[ptr[sat] : ptr[sat + 1]], self.weights[ptr[sat] : ptr[sat + 1]]))
+            for sat in range(self.num_sats)
+        ]
+
+    def k_shortest_paths(
+        self, uplinks: Dict[int, float], downlinks: Dict[int, float], k: int, cutoff: float
+    ) -> List[Tuple[List[int], float]]:
+        """
+        Compute up to k shortest simple paths no longer than cutoff, in increasing length order.
+        Args:
+            uplinks: The satellites covering the source, with the uplink lengths.
+            downlinks: The satellites covering the destination, with the downlink lengths.
+            k: Maximum number of paths.
+            cutoff: Maximum path length.
+
+        Returns:
+            List[Tuple[List[int], float]]: The satellite part of each path, and the path length including the up and
+                downlinks, summed along the path.
+        """
+        if k <= 0 or len(uplinks) == 0 or len(downlinks) == 0:
+            return []
+        src, dst = self.num_sats, self.num_sats + 1
+        to_dst = self.distances_to(downlinks)
+        to_dst.append(min(ln + to_dst[sat] for sat, ln in uplinks.items()))  # src
+        to_dst.append(0.0)  # dst
+
+        def neighbours(node: int) -> List[Tuple[int, float]]:
+            if node == src:
+                return list(uplinks.items())
+            if node in downlinks:
+                return self.neighbours[node] + [(dst, downlinks[node])]
+            return self.neighbours[node]
+
+        def spur_search(
+            start: int, budget: float, blocked_nodes: Set[int], blocked_nbrs: Set[int]
+        ) -> Optional[Tuple[float, List[int]]]:
+            # A* from start to dst, ignoring blocked_nodes and the edges from start to blocked_nbrs
+            if to_dst[start] > budget:
+                return None
+            dists, preds, done = {start: 0.0}, {start: None}, set()
+            heap = [(to_dst[start], 0.0, start)]
+            while heap:
+                _, g, node = heappop(heap)
+                if node in done:
+                    continue
+                if node == dst:
+                    path = [node]
+                    while preds[path[-1]] is not None:
+                        path.append(preds[path[-1]])
+                    path.reverse()
+                    return g, path
+                done.add(node)
+                for nbr, ln in neighbours(node):
+                    if nbr in done or nbr in blocked_nodes:
+                        continue
+                    if node == start and nbr in blocked_nbrs:
+                        continue
+                    new_g = g + ln
+                    if new_g + to_dst[nbr] > budget:
+                        continue
+                    if new_g < dists.get(nbr, float("inf")):
+                        dists[nbr] = new_g
+                        preds[nbr] = node
+                        heappush(heap, (new_g + to_dst[nbr], new_g, nbr))
+            return None
+
+        def edge_length(u: int, v: int) -> float:
+            if u == src:
+                return uplinks[v]
+            if v == dst:
+                return downlinks[u]
+            return next(ln for nbr, ln in self.neighbours[u] if nbr == v)
+
+        def path_length(path: List[int]) -> float:
+            length = 0.0
+            for i in range(len(path) - 1):
+                length += edge_length(path[i], path[i + 1])
+            return length
+
+        bound = cutoff * PRUNE_SLACK
+        first = spur_search(src, bound, set(), set())
+        if first is None:
+            return []
+        chosen = [first[1]]
+        candidates, queued, counter = [], set(), 0
+        while len(chosen) < k:
+            prev = chosen[-1]
+            root_len = 0.0
+            for i in range(1, len(prev)):
+                root = prev[:i]
+                if i > 1:
+                    root_len += edge_length(prev[i - 2], prev[i - 1])
+                blocked_nbrs = {path[i] for path in chosen if path[:i] == root}
+                spur = spur_search(root[-1], bound - root_len, set(root[:-1]), blocked_nbrs)
+                if spur is not None:
+                    path = root[:-1] + spur[1]
+                    if tuple(path) not in queued:
+                        heappush(candidates, (root_len + spur[0], counter, path))
+                        queued.add(tuple(path))
+                        counter += 1
+            if len(candidates) == 0:
+                break
+            path = heappop(candidates)[2]
+            queued.remove(tuple(path))
+            chosen.append(path)
+
+        result = []
+        for path in chosen:
+            length = path_length(path)
+            if length > cutoff:
+                break
+            result.append((path[1:-1], length))
+        return result
@@ -0,0 +1,284 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+Vectorised propagation of all the satellites of a constellation at once.
+The model is the near-earth SGP4 model without drag, which is the one used by pyephem's `EarthSatellite` for the
+orbits created by `Satellite`. Positions are returned in the same {lat, lon, elev} convention as `Satellite`.
+"""
+from typing import Dict, Tuple
+
+import ephem
+import numpy as np
+
+from .planetary_const import SEC_IN_DAY
+from .satellite import Satellite
+
+# SGP4 (WGS-72) constants, lengths in Earth radii and times in minutes
+XKE = 0.0743669161
+CK2 = 5.413080e-4
+CK4 = 0.62098875e-6
+XJ3 = -0.253881e-5
+A3OVK2 = -XJ3 / CK2
+XKMPER = 6378.135
+# Flattening used for the satellite elevation over the Earth ellipsoid
+EARTH_FLATTENING = 1 / 298.26
+MINUTES_IN_DAY = 1440
+KEPLER_ITERATIONS = 10
+# Number of snapshots propagated together, bounds the size of the intermediate arrays
+SNAPSHOTS_PER_CHUNK = 256
+
+
+class ConstellationPropagator:
+    """Propagate the orbital elements of every satellite of a constellation as arrays."""
+
+    def __init__(
+        self,
+        raan: np.ndarray,
+        mean_anomaly: np.ndarray,
+        inclination: np.ndarray,
+        mean_motion: np.ndarray,
+        epoch: str,
+        eccentricity: np.ndarray = None,
+        aug_perigee: np.ndarray = None,
+    ) -> None:
+        """
+        Args:
+            raan: Right ascension of the ascending node of each satellite, in
+                degrees.
+            mean_anomaly: Mean anomaly of each satellite at epoch, in degrees.
+            inclination: Inclination of each satellite's orbit, in degrees.
+            mean_motion: Mean motion of each satellite, in revs / day.
+            epoch: Starting epoch. Has to be a string formatted as
+                with `%Y/%m/%d %H:%M:%S`.
+            eccentricity: Eccentricity of each orbit. Defaults to circular.
+            aug_perigee: Augmentation of the perigee of each orbit, in
+                degrees. Defaults to 0.0.
+        """
+        self.raan = np.radians(np.asarray(raan, dtype=float))
+        self.mean_anomaly = np.radians(np.asarray(mean_anomaly, dtype=float))
+        self.inclination = np.radians(np.asarray(inclination, dtype=float))
+        self.mean_motion = np.asarray(mean_motion, dtype=float)
+        num_sats = self.raan.shape[0]
+        if eccentricity is None:
+            eccentricity = np.full(num_sats, 1e-32)
+        if aug_perigee is None:
+            aug_perigee = np.zeros(num_sats)
+        self.eccentricity = np.asarray(eccentricity, dtype=float)
+        self.aug_perigee = np.radians(np.asarray(aug_perigee, dtype=float))
+        self.epoch = epoch
+        self.epoch_date = float(ephem.Date(epoch))
+        self._init_secular_terms()
+
+    @staticmethod
+    def from_satellites(satellites: Dict[int, Satellite]) -> "ConstellationPropagator":
+        """Create a propagator with the orbital elements of `Satellite` objects.
+
+        Args:
+            satellites: Satellites of the constellation, keyed by satellite
+                index. The indices must be 0, ..., N-1.
+
+        Returns:
+            ConstellationPropagator: Propagator whose array entry i is the
+                satellite with index i.
+        """
+        sats = [satellites[idx] for idx in range(len(satellites))]
+        # The ephem angles built in orbit_util hold the values in degrees
+        return ConstellationPropagator(
+            raan=[float(sat.raan) for sat in sats],
+            mean_anomaly=[float(sat.mean_anomaly) for sat in sats],
+            inclination=[float(sat.inclination) for sat in sats],
+            mean_motion=[sat.mean_motion for sat in sats],
+            epoch=sats[0].epoch,
+            eccentricity=[sat.eccentricity for sat in sats],
+            aug_perigee=[sat.aug_perigee for sat in sats],
+        )
+
+    def _init_secular_terms(self) -> None:
+        # Recover the original mean motion and semi-major axis from the elements
+        cosio, sinio = np.cos(self.inclination), np.sin(self.inclination)
+        theta2 = cosio ** 2
+        theta4 = theta2 ** 2
+        x3thm1 = 3 * theta2 - 1
+        betao2 = 1 - self.eccentricity ** 2
+        betao = np.sqrt(betao2)
+        no = self.mean_motion * 2 * np.pi / MINUTES_IN_DAY
+        if np.any(2 * np.pi / no >= 225):
+            raise ValueError("Only near-earth orbits (period < 225 min) are supported")
+        a1 = np.power(XKE / no, 2 / 3)
+        del1 = 1.5 * CK2 * x3thm1 / (a1 ** 2 * betao * betao2)
+        ao = a1 * (1 - del1 * (1 / 3 + del1 * (1 + 134 / 81 * del1)))
+        delo = 1.5 * CK2 * x3thm1 / (ao ** 2 * betao * betao2)
+        xnodp = no / (1 + delo)
+        self.aodp = ao / (1 - delo)
+
+        # Secular rates of mean anomaly, argument of perigee and node
+        pinvsq = 1 / (self.aodp ** 2 * betao2 ** 2)
+        temp1 = 3 * CK2 * pinvsq * xnodp
+        temp2 = temp1 * CK2 * pinvsq
+        temp3 = 1.25 * CK4 * pinvsq ** 2 * xnodp
+        self.xmdot = (
+            xnodp
+            + 0.5 * temp1 * betao * x3thm1
+            + 0.0625 * temp2 * betao * (13 - 78 * theta2 + 137 * theta4)
+        )
+        self.omgdot = (
+            -0.5 * temp1 * (1 - 5 * theta2)
+            + 0.0625 * temp2 * (7 - 114 * theta2 + 395 * theta4)
+            + temp3 * (3 - 36 * theta2 + 49 * theta4)
+        )
+        self.xnodot = (
+            -temp1 * cosio
+            + (0.5 * temp2 * (4 - 19 * theta2) + 2 * temp3 * (3 - 7 * theta2)) * cosio
+        )
+
+        # Long-period and short-period coefficients
+        self.xlcof = 0.125 * A3OVK2 * sinio * (3 + 5 * cosio) / (1 + cosio)
+        self.aycof = 0.25 * A3OVK2 * sinio
+        self.cosio, self.sinio = cosio, sinio
+        self.theta2, self.x3thm1 = theta2, x3thm1
+
+    def minutes_since_epoch(self, timestr: str) -> float:
+        """Minutes elapsed between epoch and a time formatted as with `%Y/%m/%d %H:%M:%S`."""
+        return (float(ephem.Date(timestr)) - self.epoch_date) * MINUTES_IN_DAY
+
+    def propagate(self, tsince) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the inertial (TEME) cartesian positions of all satellites.
+        Args:
+            tsince: Minutes elapsed since epoch. Either a scalar, or an array of
+                shape (T, 1) to propagate T snapshots at once.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: x, y, z coordinates in
+                meters, with shape (N,) for a scalar time and (T, N) otherwise.
+        """
+        # Secular update
+        xmdf = self.mean_anomaly + self.xmdot * tsince
+        omega = self.aug_perigee + self.omgdot * tsince
+        xnode = self.raan + self.xnodot * tsince
+        a, e = self.aodp, self.eccentricity
+        xl = xmdf + omega + xnode
+
+        # Long-period periodics
+        axn = e * np.cos(omega)
+        temp = 1 / (a * (1 - e ** 2))
+        xlt = xl + temp * self.xlcof * axn
+        ayn = e * np.sin(omega) + temp * self.aycof
+
+        # Kepler's equation, solved with at most KEPLER_ITERATIONS Newton steps
+        capu = np.mod(xlt - xnode, 2 * np.pi)
+        epw = capu
+        for _ in range(KEPLER_ITERATIONS):
+            sinepw, cosepw = np.sin(epw), np.cos(epw)
+            delta = (capu - ayn * cosepw + axn * sinepw - epw) / (
+                1 - axn * cosepw - ayn * sinepw
+            )
+            epw = epw + delta
+            if np.max(np.abs(delta)) < 1e-12:
+                break
+        sinepw, cosepw = np.sin(epw), np.cos(epw)
+
+        # Short-period preliminary quantities
+        ecose = axn * cosepw + ayn * sinepw
+        esine = axn * sinepw - ayn * cosepw
+        elsq = axn ** 2 + ayn ** 2
+        pl = a * (1 - elsq)
+        r = a * (1 - ecose)
+        betal = np.sqrt(1 - elsq)
+        cosu = a / r * (cosepw - axn + ayn * esine / (1 + betal))
+        sinu = a / r * (sinepw - ayn - axn * esine / (1 + betal))
+        u = np.arctan2(sinu, cosu)
+        sin2u, cos2u = 2 * sinu * cosu, 2 * cosu ** 2 - 1
+
+        # Short-period periodics
+        temp1 = CK2 / pl
+        temp2 = temp1 / pl
+        rk = (
+            r * (1 - 1.5 * temp2 * betal * self.x3thm1)
+            + 0.5 * temp1 * (1 - self.theta2) * cos2u
+        )
+        uk = u - 0.25 * temp2 * (7 * self.theta2 - 1) * sin2u
+        xnodek = xnode + 1.5 * temp2 * self.cosio * sin2u
+        xinck = self.inclination + 1.5 * temp2 * self.cosio * self.sinio * cos2u
+
+        # Orientation vectors
+        sinuk, cosuk = np.sin(uk), np.cos(uk)
+        sinik, cosik = np.sin(xinck), np.cos(xinck)
+        sinnok, cosnok = np.sin(xnodek), np.cos(xnodek)
+        xmx, xmy = -sinnok * cosik, cosnok * cosik
+        rk = rk * XKMPER * 1000
+        x = rk * (xmx * sinuk + cosnok * cosuk)
+        y = rk * (xmy * sinuk + sinnok * cosuk)
+        z = rk * sinik * sinuk
+        return x, y, z
+
+    def positions_at_time(self, timestr: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute the positions of all satellites at a specific time.
+        Args:
+            timestr: Time for which to compute the positions. Has to be a string
+            formatted as with `%Y/%m/%d %H:%M:%S`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: lat and lon in degrees
+                and elev in meters, one entry per satellite.
+        """
+        x, y, z = self.propagate(self.minutes_since_epoch(timestr))
+        return teme_to_lat_long_elev(x, y, z, float(ephem.Date(timestr)))
+
+    def positions_at_epoch_offsets(self, offsets: np.ndarray) -> np.ndarray:
+        """
+        Compute the positions of all satellites for many epoch offsets.
+        Args:
+            offsets: Array of T offsets from epoch, in seconds.
+
+        Returns:
+            np.ndarray: Array of shape (T, N, 3), holding the lat and lon in
+                degrees and the elev in meters of every satellite at every
+                offset.
+        """
+        offsets = np.asarray(offsets, dtype=float).reshape(-1, 1)
+        positions = np.empty((offsets.shape[0], self.raan.shape[0], 3))
+        for start in range(0, offsets.shape[0], SNAPSHOTS_PER_CHUNK):
+            chunk = offsets[start : start + SNAPSHOTS_PER_CHUNK]
+            x, y, z = self.propagate(chunk / 60)
+            lat, lon, elev = teme_to_lat_long_elev(
+                x, y, z, self.epoch_date + chunk / SEC_IN_DAY
+            )
+            positions[start : start + chunk.shape[0], :, 0] = lat
+            positions[start : start + chunk.shape[0], :, 1] = lon
+            positions[start : start + chunk.shape[0], :, 2] = elev
+        return positions
+
+
+def greenwich_sidereal_time(date):
+    """Greenwich mean sidereal time in radians, for `ephem.Date` values (scalar or array)."""
+    t = (date + 2415020.0 - 2451545.0) / 36525
+    gmst = (
+        67310.54841
+        + (876600 * 3600 + 8640184.812866) * t
+        + 0.093104 * t ** 2
+        - 6.2e-6 * t ** 3
+    )
+    return np.radians(np.mod(gmst / 240, 360))
+
+
+def teme_to_lat_long_elev(
+    x: np.ndarray, y: np.ndarray, z: np.ndarray, date
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert inertial positions to the sub-satellite point, as pyephem does.
+    Args:
+        x, y, z: Inertial coordinates in meters.
+        date: The `ephem.Date` value of the positions, scalar or broadcastable
+            to the coordinates.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: geocentric lat and lon in
+            degrees, elevation in meters over the Earth ellipsoid.
+    """
+    lat = np.arctan2(z, np.hypot(x, y))
+    lon = np.mod(np.arctan2(y, x) - greenwich_sidereal_time(date) + np.pi, 2 * np.pi)
+    r = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+    elev = r - XKMPER * 1000 * (1 - EARTH_FLATTENING * np.sin(lat) ** 2)
+    return np.degrees(lat), np.degrees(lon - np.pi), elev
@@ -0,0 +1,149 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+
+"""
+Routing view of a satellite network.
+The ground nodes of a pair and the edges masked by a routing algorithm only exist in the overlay: the base network is
+never modified, so one graph can be shared by all the routing computations of a process.
+"""
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from .coordinate_util import GeodeticPosition, geo2cart
+from .isl_topology import SAT_CART
+
+SEARCH_METHODS = ("dijkstra", "astar", "bidir")
+# Shrinks the straight-line heuristic, so that rounding errors never make it overestimate
+HEURISTIC_SLACK = 1 - 1e-9
+
+
+class GroundOverlay(nx.Graph):
+    """
+    A networkx graph that reads through to a base network, with virtual ground nodes and masked edges on top.
+    Only the outer node and adjacency dicts are copied: the neighbour dicts are shared with the base network, and
+    copied on write for the satellites linked to the ground nodes and the endpoints of masked edges. Node and
+    neighbour orders are the same as adding the ground nodes to the base network.
+    """
+
+    def __init__(
+        self,
+        base: nx.Graph,
+        gnd_links: Dict[int, Dict[int, float]],
+        gnd_pos: Optional[Dict[int, GeodeticPosition]] = None,
+    ) -> None:
+        """
+        Args:
+            base: The satellite network, edges must have the `length` attribute. It is not modified.
+            gnd_links: {gnd_node: {sat: length}}, the virtual nodes to add with their links.
+            gnd_pos: {gnd_node: position}, needed only by the geometric searches.
+        """
+        super().__init__()
+        self.base = base
+        self.graph = base.graph
+        self.gnd_pos = gnd_pos
+        self.masked: Dict[Tuple[int, int], dict] = {}
+        self._owned: Set[int] = set()
+        self._node = dict(base._node)
+        self._adj = dict(base._adj)
+        for gnd, links in gnd_links.items():
+            self._node[gnd] = {}
+            self._adj[gnd] = {}
+            self._owned.add(gnd)
+            for sat, length in links.items():
+                attr = {"length": length}
+                self._adj[gnd][sat] = attr
+                self._own_atlas(sat)[gnd] = attr
+
+    def _own_atlas(self, node: int) -> dict:
+        if node not in self._owned:
+            self._adj[node] = dict(self._adj[node])
+            self._owned.add(node)
+        return self._adj[node]
+
+    def is_masked(self, u: int, v: int) -> bool:
+        return (min(u, v), max(u, v)) in self.masked
+
+    def mask_edge(self, u: int, v: int) -> None:
+        """Set the length of an edge to infinity. The edge still counts for connectivity."""
+        attr = self._adj[u][v]
+        masked_attr = {**attr, "length": float("inf")}
+        self._own_atlas(u)[v] = masked_attr
+        self._own_atlas(v)[u] = masked_attr
+        self.masked[(min(u, v), max(u, v))] = attr
+
+    def unmask_edge(self, u: int, v: int) -> None:
+        attr = self.masked.pop((min(u, v), max(u, v)))
+        self._adj[u][v] = attr
+        self._adj[v][u] = attr
+
+    def node_cart(self, node: int) -> np.ndarray:
+        """Cartesian position of a satellite or of a ground node."""
+        if node >= 0:
+            return self.graph[SAT_CART][node]
+        return np.array(geo2cart(self.gnd_pos[node]))
+
+
+def path_length(graph: nx.Graph, path: List[int]) -> float:
+    length = 0.0
+    for i in range(len(path) - 1):
+        length += graph._adj[path[i]][path[i + 1]]["length"]
+    return length
+
+
+def shortest_path(
+    overlay: GroundOverlay, source: int, target: int, cutoff: float, method: str = "dijkstra"
+) -> Tuple[float, List[int]]:
+    """
+    Shortest path from source to target with length up to cutoff, raising nx.NetworkXNoPath if there is none.
+    All the methods return the same length, equal-length paths might be chosen differently.
+    Args:
+        overlay: The routing graph. The geometric methods need the satellite positions of the base network and the
+            positions of the ground nodes.
+        source: The source node.
+        target: The target node.
+        cutoff: The maximum path length.
+        method: "dijkstra" for networkx' Dijkstra search; "astar" for A*, using the straight-line distance to the
+            target as heuristic; "bidir" for bidirectional Dijkstra, restricted to the satellites inside the
+            ellipse of the points whose distance from source plus distance from target is at most cutoff.
+            Every edge is a straight segment, so both bounds never discard a path shorter than cutoff.
+
+    Returns:
+        Tuple[float, List[int]]: The path length and the path.
+    """
+    if method == "dijkstra":
+        return nx.single_source_dijkstra(
+            overlay, source, target, cutoff=cutoff, weight="length"
+        )
+    sat_cart = overlay.graph[SAT_CART]
+    dst_cart = overlay.node_cart(target)
+    to_dst = np.sqrt(np.sum(np.square(sat_cart - dst_cart), axis=1))
+    if method == "astar":
+        heur = (to_dst * HEURISTIC_SLACK).tolist()
+        path = nx.astar_path(
+            overlay,
+            source,
+            target,
+            heuristic=lambda u, v: heur[u] if u >= 0 else 0.0,
+            weight="length",
+            cutoff=cutoff,
+        )
+        return path_length(overlay, path), path
+    if method == "bidir":
+        src_cart = overlay.node_cart(source)
+        to_src = np.sqrt(np.sum(np.square(sat_cart - src_cart), axis=1))
+        inside = ((to_src + to_dst) * HEURISTIC_SLACK <= cutoff).tolist()
+
+        def weight(u: int, v: int, attr: dict) -> Optional[float]:
+            if (u >= 0 and not inside[u]) or (v >= 0 and not inside[v]):
+                return None
+            if math.isinf(attr["length"]):
+                return None
+            return attr["length"]
+
+        length, path = nx.bidirectional_dijkstra(overlay, source, target, weight=weight)
+        if length > cutoff:
+            raise nx.NetworkXNoPath(f"No path between {source} and {target} within {cutoff}.")
+        return path_length(overlay, path), path
+    raise ValueError(f"Unknown search method {method}, choose one of {SEARCH_METHODS}")
@@ -1 +1,2 @@
 from .bin_search_optim_strat import BinSearchOptimStrat
+from .param_optim_strat import ParamOptimStrat
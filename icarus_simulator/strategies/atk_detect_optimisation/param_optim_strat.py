@@ -0,0 +1,107 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+from math import ceil
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from icarus_simulator.strategies.atk_detect_optimisation.base_optim_strat import (
+    BaseOptimStrat,
+)
+from icarus_simulator.strategies.atk_feasibility_check.attack_lp import AttackLp
+from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
+    BaseFeasStrat,
+)
+from icarus_simulator.structure_definitions import (
+    Edge,
+    PathData,
+    DirectionData,
+    BwData,
+    AtkFlowSet,
+)
+
+BOUND_TOLERANCE = 1e-6
+
+
+# Same results as BinSearchOptimStrat, without its log2(uplink_max_val) feasibility checks: the lowest feasible uplink
+# bound is found as the optimum of a single LP, then only verified with feas_strat
+class ParamOptimStrat(BaseOptimStrat):
+    def __init__(self, rate: float, **kwargs):
+        super().__init__()
+        if len(kwargs) > 0:
+            pass  # Appease the unused param inspection
+        assert 0.0 <= rate <= 1.0
+        self.rate = rate
+
+    @property
+    def name(self) -> str:
+        return "par"
+
+    @property
+    def param_description(self) -> str:
+        return f"{self.rate}"
+
+    def compute(
+        self,
+        congest_edges: List[Edge],
+        path_data: PathData,
+        bw_data: BwData,
+        direction_data: DirectionData,
+        uplink_max_val: int,
+        feas_strat: BaseFeasStrat,
+    ) -> Tuple[Optional[AtkFlowSet], int, int]:
+
+        # If the rate is 0, no optimisation is required
+        if self.rate == 0.0:
+            return feas_strat.compute(
+                congest_edges, path_data, bw_data, direction_data, uplink_max_val
+            )
+
+        # The results of feas_strat for every increase constraint checked, reused by the final run
+        checked: Dict[int, Tuple[Optional[AtkFlowSet], int, int]] = {}
+
+        def feasible(val: int) -> bool:
+            checked[val] = feas_strat.compute(
+                congest_edges, path_data, bw_data, direction_data, val
+            )
+            return checked[val][0] is not None
+
+        # As in the binary search, left is always infeasible, right always feasible and INCLUSIVE
+        left, right = 0, uplink_max_val
+        bound = None
+        if len(direction_data) > 0:
+            lp = AttackLp(congest_edges, bw_data, direction_data)
+            if np.any(lp.is_uplink[lp.congest_rows]):
+                # The saturation of an uplink target shrinks with the bound: try the lowest one first
+                bound = 0.0
+            else:
+                bound = lp.min_max_uplink(uplink_max_val)
+        if bound is not None:
+            # Feasibility is monotone in the constraint: the guess and the value below it bracket the lowest one
+            guess = min(max(int(ceil(bound - BOUND_TOLERANCE)), 1), uplink_max_val)
+            for val in (guess, guess - 1):
+                if left < val < right:
+                    if feasible(val):
+                        right = val
+                    else:
+                        left = val
+
+        # Finish with a binary search if the guess was off, e.g. with non-LP feasibility strategies
+        while left < right - 1:
+            half = left + int(ceil((right - left) / 2))
+            if feasible(half):
+                right = half
+            else:
+                left = half
+        final_val = right
+
+        # Based on the optimisation rate chosen, re-run for the correct value
+        val_range = uplink_max_val - final_val
+        val_incr = int(
+            self.rate * val_range
+        )  # Taking floor here ensures that ceil is taken in next line
+        req_detect = uplink_max_val - val_incr
+        if req_detect in checked:
+            return checked[req_detect]
+        return feas_strat.compute(
+            congest_edges, path_data, bw_data, direction_data, req_detect
+        )
@@ -1,2 +1,4 @@
 from .prob_feas_strat import ProbFeasStrat
 from .lp_feas_strat import LPFeasStrat
+from .highs_feas_strat import HighsFeasStrat
+from .maxflow_feas_strat import MaxFlowFeasStrat
@@ -0,0 +1,129 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Sparse formulation of the single-target attack linear program, shared by the LP-based feasibility strategies.
+The variables are the bw in flows assigned to each direction, the objective is their sum, and the constraints are the
+bw limitations of the edges: each edge crossed by a direction gets a row bounding its load by the remaining bw, and
+each congest edge gets an additional inverted row, to force its saturation. The uplinks are also bounded by the
+maximum uplink increase, the only right-hand side that changes between the solves of the detectability optimisation,
+which can also be found directly as the lowest feasible bound.
+"""
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import csr_matrix, hstack, vstack
+
+from icarus_simulator.structure_definitions import (
+    Edge,
+    DirectionData,
+    BwData,
+    AtkFlowSet,
+    TuplePath,
+)
+from icarus_simulator.utils import get_edges
+
+
+class AttackLp:
+    def __init__(self, congest_edges: List[Edge], bw_data: BwData, direction_data: DirectionData) -> None:
+        self.congest_edges = congest_edges
+        self.directions = list(direction_data.keys())
+
+        # Go through the edges and find out their coverage and their remaining bw
+        # IMPORTANT: take the sum of variables as total bw, and as objective, to avoid having pass-through directions
+        # counted two times
+        edge_rows: Dict[Edge, int] = {}
+        rows, cols = [], []
+        for idx, p in enumerate(self.directions):
+            for ed in get_edges(p):
+                row = edge_rows.get(ed)
+                if row is None:
+                    row = edge_rows[ed] = len(edge_rows)
+                rows.append(row)
+                cols.append(idx)
+        for ed in congest_edges:
+            if ed not in edge_rows:
+                edge_rows[ed] = len(edge_rows)
+        self.edges: List[Edge] = list(edge_rows.keys())
+        self.tot_needed = sum(bw_data[ed].get_remaining_bw() for ed in congest_edges)
+        self.remaining = np.array([bw_data[ed].get_remaining_bw() for ed in self.edges], dtype=np.float64)
+        self.is_uplink = np.array([ed[0] == -1 for ed in self.edges], dtype=bool)
+        self.congest_rows = np.array([edge_rows[ed] for ed in congest_edges], dtype=np.int64)
+
+        # Each direction counts once per edge, even if it crosses it more than once
+        shape = (len(self.edges), len(self.directions))
+        flat = np.unique(np.array(rows, dtype=np.int64) * shape[1] + np.array(cols, dtype=np.int64))
+        self.incidence = csr_matrix(
+            (np.ones(len(flat)), (flat // shape[1], flat % shape[1])), shape=shape
+        )
+
+    @property
+    def num_directions(self) -> int:
+        return len(self.directions)
+
+    def a_ub(self) -> csr_matrix:
+        """Matrix of the leq constraints: all edges, then the congest edges with inverted sign."""
+        return vstack([self.incidence, -self.incidence[self.congest_rows]], format="csr")
+
+    def b_ub(self, max_uplink_increase: int) -> np.ndarray:
+        caps = self.edge_caps(max_uplink_increase)
+        return np.concatenate([caps, -caps[self.congest_rows]])
+
+    def edge_caps(self, max_uplink_increase: int) -> np.ndarray:
+        return np.where(self.is_uplink, np.minimum(self.remaining, max_uplink_increase), self.remaining)
+
+    def min_max_uplink(self, uplink_max_val: int) -> Optional[float]:
+        """
+        Lowest bound on the uplink loads for which the program is feasible, solved as a single LP with the bound as an
+        auxiliary variable. None if infeasible even with bound uplink_max_val.
+        Only valid if no congest edge is an uplink, as its saturation would depend on the bound itself.
+        """
+        assert not np.any(self.is_uplink[self.congest_rows])
+        # Append a bound column, and a row per uplink, bounding its load by the bound
+        uplinks = np.flatnonzero(self.is_uplink)
+        a_ub = self.a_ub()
+        a_ub = vstack(
+            [
+                hstack([a_ub, csr_matrix((a_ub.shape[0], 1))]),
+                hstack([self.incidence[uplinks], csr_matrix(-np.ones((len(uplinks), 1)))]),
+            ],
+            format="csr",
+        )
+        b_ub = np.concatenate([self.b_ub(uplink_max_val), np.zeros(len(uplinks))])
+        cost = np.zeros(self.num_directions + 1)
+        cost[-1] = 1.0
+        res = linprog(cost, A_ub=a_ub, b_ub=b_ub, bounds=(0, None), method="highs")
+        if res.status != 0:
+            return None
+        return float(res.x[-1])
+
+    def attack_result(
+        self, x: np.ndarray, direction_data: DirectionData
+    ) -> Tuple[Optional[AtkFlowSet], int, int]:
+        """Turn the flows of an optimal solution into a conformant atkflowset, the flows on target and the detect."""
+        # Integer flows per direction, robust to the solver tolerances
+        vals = np.floor(np.asarray(x) + 1e-6).astype(np.int64)
+        sending = np.flatnonzero(vals > 0)
+        edges_bw = self.incidence @ vals.astype(np.float64)
+        uplink_bw = edges_bw[self.is_uplink]
+        detect = int(uplink_bw.max()) if len(sending) > 0 and len(uplink_bw) > 0 else 0
+
+        atk_flow_set = conformant_flow_set(
+            zip([self.directions[idx] for idx in sending.tolist()], vals[sending].tolist()), direction_data
+        )
+        return atk_flow_set, self.tot_needed, detect
+
+
+def conformant_flow_set(directions_bw: Iterable[Tuple[TuplePath, int]], direction_data: DirectionData) -> AtkFlowSet:
+    """Find a conformant atkflowset, distribute the flows of each direction equally among the originating pairs."""
+    atk_flow_set = set()
+    for dire, bw in directions_bw:
+        pairs = direction_data[dire]
+        flows_per_pair = max(5, int(ceil(bw / len(pairs))))  # Enforce a min of 5 per pair for attack efficiency
+        for pair in pairs:
+            if bw == 0:
+                break
+            flows = min(flows_per_pair, bw)
+            atk_flow_set.add((pair, flows))
+            bw -= flows
+    return atk_flow_set
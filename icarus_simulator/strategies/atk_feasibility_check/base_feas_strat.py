@@ -16,8 +16,18 @@ from icarus_simulator.structure_definitions import (
     AtkFlowSet,
 )
 
+# The arguments and the result of a compute
+FeasProblem = Tuple[List[Edge], PathData, BwData, DirectionData, int]
+FeasResult = Tuple[Optional[AtkFlowSet], int, int]
+
 
 class BaseFeasStrat(BaseStrat):
+    def __init__(self, **kwargs):
+        super().__init__()
+        # Seconds spent starting solver sessions, and solving, reported separately by the attack workers
+        self.startup_time = 0.0
+        self.solve_time = 0.0
+
     @abstractmethod
     def compute(
         self,
@@ -26,9 +36,20 @@ class BaseFeasStrat(BaseStrat):
         bw_data: BwData,
         direction_data: DirectionData,
         max_uplink_increase: int,
-    ) -> Tuple[Optional[AtkFlowSet], int, int]:
+    ) -> FeasResult:
         raise NotImplementedError
 
-    @abstractmethod
+    def compute_batch(self, problems: List[FeasProblem]) -> List[FeasResult]:
+        # Check many independent problems. Override if the solver can do it faster than one at a time
+        return [self.compute(*problem) for problem in problems]
+
+    # Solver session lifecycle: a session is opened once per worker process, and reused by all its computes
+    def open_session(self) -> None:
+        return None
+
+    def close_session(self) -> None:
+        self.empty_enviorment()
+
     def empty_enviorment(self):
-        return None
\ No newline at end of file
+        # Drop any solver state, e.g. the one of the copied strategy
+        return None
@@ -0,0 +1,113 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+import time
+from typing import List
+
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import block_diag, csr_matrix, hstack
+
+from icarus_simulator.strategies.atk_feasibility_check.attack_lp import AttackLp
+from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
+    BaseFeasStrat,
+    FeasProblem,
+    FeasResult,
+)
+from icarus_simulator.structure_definitions import (
+    Edge,
+    PathData,
+    DirectionData,
+    BwData,
+)
+
+SLACK_PENALTY = 2.0
+SLACK_TOLERANCE = 1e-6
+
+
+# Same program as LPFeasStrat, solved by the HiGHS solver shipped with scipy: no license or network is needed
+class HighsFeasStrat(BaseFeasStrat):
+    def __init__(self, **kwargs):
+        super().__init__()
+        if len(kwargs) > 0:
+            pass  # Appease the unused param inspection
+
+    @property
+    def name(self) -> str:
+        return "hgs"
+
+    @property
+    def param_description(self) -> None:
+        return None
+
+    def empty_enviorment(self):
+        # HiGHS needs no environment, every solve is self-contained
+        return None
+
+    # Important note: this only works for single-target attacks!
+    def compute(
+        self,
+        congest_edges: List[Edge],
+        path_data: PathData,
+        bw_data: BwData,
+        direction_data: DirectionData,
+        max_uplink_increase: int,
+    ) -> FeasResult:
+        if len(direction_data) == 0:
+            return None, -1, -1
+        lp = AttackLp(congest_edges, bw_data, direction_data)
+        start = time.time()
+        res = linprog(
+            np.ones(lp.num_directions),
+            A_ub=lp.a_ub(),
+            b_ub=lp.b_ub(max_uplink_increase),
+            bounds=(0, None),
+            method="highs",
+        )
+        self.solve_time += time.time() - start
+        if res.status != 0:  # LP not feasible, attack not possible!
+            return None, -1, -1
+        return lp.attack_result(res.x, direction_data)
+
+    def compute_batch(self, problems: List[FeasProblem]) -> List[FeasResult]:
+        """
+        Solve many independent feasibility problems in a single block-diagonal program.
+        Each block gets a slack variable on its congest rows, penalised in the objective, so that the program is always
+        feasible. As all the directions end on the single target, the flow in a block equals the load on the target,
+        and any penalty above 1 makes the slack zero exactly when the block is feasible. The feasibility and the flows
+        on target are the same as with compute, the atkflowsets are optimal but can differ when the optimum is not
+        unique.
+        """
+        results: List[FeasResult] = [(None, -1, -1)] * len(problems)
+        lps, lp_ids, blocks, b_ubs = [], [], [], []
+        for idx, (congest_edges, _, bw_data, direction_data, max_uplink_increase) in enumerate(problems):
+            if len(direction_data) == 0:
+                continue
+            lp = AttackLp(congest_edges, bw_data, direction_data)
+            a_ub = lp.a_ub()
+            slack = np.zeros((a_ub.shape[0], 1))
+            slack[len(lp.edges) :] = -1.0
+            blocks.append(hstack([a_ub, csr_matrix(slack)], format="csr"))
+            b_ubs.append(lp.b_ub(max_uplink_increase))
+            lps.append(lp)
+            lp_ids.append(idx)
+        if len(lps) == 0:
+            return results
+
+        offsets = np.cumsum([0] + [lp.num_directions + 1 for lp in lps])
+        cost = np.ones(offsets[-1])
+        cost[offsets[1:] - 1] = SLACK_PENALTY
+        start = time.time()
+        res = linprog(
+            cost,
+            A_ub=block_diag(blocks, format="csr"),
+            b_ub=np.concatenate(b_ubs),
+            bounds=(0, None),
+            method="highs",
+        )
+        self.solve_time += time.time() - start
+        if res.status != 0:  # Only possible on numerical troubles, fall back to the single solves
+            return [self.compute(*problem) for problem in problems]
+        for i, (idx, lp) in enumerate(zip(lp_ids, lps)):
+            x = res.x[offsets[i] : offsets[i + 1]]
+            if x[-1] <= SLACK_TOLERANCE:  # Otherwise the LP is not feasible, attack not possible!
+                results[idx] = lp.attack_result(x[:-1], problems[idx][3])
+        return results
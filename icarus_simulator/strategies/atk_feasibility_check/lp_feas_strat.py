@@ -1,11 +1,12 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
 import random
+import time
 import numpy as np
-from math import ceil
 from typing import List, Optional, Tuple
 import gurobipy as gp
 from gurobipy import GRB
 
+from icarus_simulator.strategies.atk_feasibility_check.attack_lp import AttackLp
 from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
     BaseFeasStrat,
 )
@@ -15,9 +16,7 @@ from icarus_simulator.structure_definitions import (
     DirectionData,
     BwData,
     AtkFlowSet,
-    PathEdgeData,
 )
-from icarus_simulator.utils import get_edges
 
 
 class LPFeasStrat(BaseFeasStrat):
@@ -38,6 +37,7 @@ class LPFeasStrat(BaseFeasStrat):
     def create_environment(self):
         """Initializes the Gurobi environment if it hasn't been created yet."""
         if self.env is None:
+            start = time.time()
             self.env = gp.Env(empty=True)
             self.env.setParam("OutputFlag", 0)
             while True:
@@ -46,7 +46,11 @@ class LPFeasStrat(BaseFeasStrat):
                     break
                 except gp.GurobiError as e:
                     print("Gurobi error encountered:", e)
-    
+            self.startup_time += time.time() - start
+
+    def open_session(self) -> None:
+        self.create_environment()
+
     def empty_enviorment(self):
         if self.env is not None:
             self.env.dispose()
@@ -62,147 +66,39 @@ class LPFeasStrat(BaseFeasStrat):
         max_uplink_increase: int,
     ) -> Tuple[Optional[AtkFlowSet], int, int]:
 
-        directions = list(direction_data.keys())
-
-        if len(directions) == 0:
+        if len(direction_data) == 0:
             return None, -1, -1
 
-        # Go through the edges and find out their coverage and their max bw
-        # IMPORTANT: take the sum of variables as total bw, and as objective, to avoid having pass-through directions
-        # counted two times
-        direction_edges: PathEdgeData = {}
-        tot_needed = 0
-        for idx, p in enumerate(directions):
-            for ed in get_edges(p):
-                if ed not in direction_edges and ed not in congest_edges:
-                    direction_edges[ed] = set()
-                elif ed not in direction_edges and ed in congest_edges:
-                    tot_needed += bw_data[ed].get_remaining_bw()
-                    direction_edges[ed] = set()
-                direction_edges[ed].add(idx)
-
-        # Formulate the linear program
+        # Formulate the linear program, assembled as sparse matrices
         # The variables are the bw in flows assigned to each direction, the constraints are the bw limitations of edges
         # In each row of the constraint matrix, the index to the corresponding path will be set to 1
+        # Congest edges also need the greater-than constraint -> inverted sign
+        lp = AttackLp(congest_edges, bw_data, direction_data)
+        sparse_g = lp.a_ub()
+        numpy_h = lp.b_ub(max_uplink_increase)
+        numpy_c = np.ones(lp.num_directions)
 
-        # Matrix for leq inequalities
-        # Num of columns is number of directions, so len(directions)
-        # Num of rows is complicated:
-        #  - each path gets a constraint for bw >= 0                           len(directions)
-        #  - each edge gets a constraint for bw <= cap                         len(direction_edges)
-        #  - each congest edge gets an additional constr to make equality      len(congest_edges)
-        # We need to track where each uplink edge is in the matrix in order to update the constraints
-        num_rows = len(direction_edges) + len(congest_edges)
-        numpy_g = np.zeros((num_rows, len(directions)))
-        numpy_h = np.zeros(num_rows)
-        numpy_c = np.ones(len(directions))
-
-        curr_row = 0
-        # All edges need the less-than constraint
-        for e in direction_edges:
-            if e[0] == -1:
-                numpy_h[curr_row] = min(
-                    bw_data[e].get_remaining_bw(), max_uplink_increase
-                )
-            else:
-                numpy_h[curr_row] = bw_data[e].get_remaining_bw()
-            for j in direction_edges[e]:
-                numpy_g[curr_row, j] = 1.0
-            curr_row += 1
-
-        # Congest edges also need the greater-than constraint -> invert sign!
-        for e in congest_edges:
-            if e[0] == -1:
-                numpy_h[curr_row] = -min(
-                    bw_data[e].get_remaining_bw(), max_uplink_increase
-                )
-            else:
-                numpy_h[curr_row] = -bw_data[e].get_remaining_bw()
-            for j in direction_edges[e]:
-                numpy_g[curr_row, j] = -1.0
-            curr_row += 1
-        import subprocess
-
-        # Command to be executed
-        command = ["gurobi_cl", "-t"]
-
-        # Execute the command
-        # result = subprocess.run(command, capture_output=True, text=True)
-        # if result.returncode == 0:
-        #     print("Command executed successfully.")
-        #     print("Output:\n", result.stdout)
-        # else:
-        #     print("Error in executing command.")
-        #     print("Error output:\n", result.stderr)
-        # Prepare Gurobi problem -> we import gurobi here as not everybody may habve it installed!
-
-        # env = gp.Env(empty=True)
-        # env.setParam("OutputFlag", 0)
-        # # env.start()
-        # import time
-        # start_time = time.time()
-        
-        # counter = 0
-        # while True:
-        #     try:
-        #         env.start()
-        #         break
-        #     except gp.GurobiError as e:
-        #         print("Gurobi error encountered:", e)
-        #         wait_time = random_wait()
-        #         time.sleep(wait_time)
-        #         counter += 1
-        #     except Exception as e:
-        #         print("Other error encountered:", e)
-        #         counter += 1
-
-        # if counter >= 1:
-        #     print(f"Failed times: {counter}")
-        #     print(f"Time: {time.time() - start_time}")
-        
+        # Prepare Gurobi problem
         self.create_environment()
-        
+
+        start = time.time()
         m = gp.Model("attack", env=self.env)
-        x = m.addMVar(shape=len(directions), lb=0.0, name="x")
+        x = m.addMVar(shape=lp.num_directions, lb=0.0, name="x")
         m.setObjective(numpy_c @ x, GRB.MINIMIZE)  # @ is matrix product!
         # noinspection PyArgumentList
-        m.addConstr(numpy_g @ x <= numpy_h, name="c")
+        m.addMConstr(sparse_g, x, GRB.LESS_EQUAL, numpy_h, name="c")
         m.optimize()
+        self.solve_time += time.time() - start
 
         if m.status != GRB.OPTIMAL:  # LP not feasible, attack not possible!
+            m.dispose()
             return None, -1, -1
 
-        # Gather info about the amount of flow each direction sends
-        lp_vars, directions_bw, edges_bw = m.getVars(), {}, {}
-        for i in range(len(directions)):
-            # Get the value of the variable
-            val = int(lp_vars[i].x)
-            if val > 0:
-                directions_bw[directions[i]] = val
-                for ed in get_edges(directions[i]):
-                    if ed not in edges_bw:
-                        edges_bw[ed] = 0
-                    edges_bw[ed] += val
-
-        # Find a conformant atkflowset, distribute each direction equally among the originating pairs
-        atk_flow_set = set()
-        for dire, bw in directions_bw.items():
-            tot_pairs = len(direction_data[dire])
-            flows_per_pair = max(
-                5, int(ceil(bw / tot_pairs))
-            )  # Enforce a min of 5 per pair for attack efficiency
-            for pair in direction_data[dire]:
-                if bw == 0:
-                    break
-                flows = min(flows_per_pair, bw)
-                atk_flow_set.add((pair, flows))
-                bw -= flows
+        # Gather the amount of flow each direction sends, and find a conformant atkflowset
+        result = lp.attack_result(x.X, direction_data)
         m.dispose()
-        return (
-            atk_flow_set,
-            tot_needed,
-            max(edges_bw[ed] for ed in edges_bw if ed[0] == -1),
-        )
+        return result
+
 
 def random_wait():
     return random.uniform(0.5, 1)
\ No newline at end of file
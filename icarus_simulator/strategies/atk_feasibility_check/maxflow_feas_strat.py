@@ -0,0 +1,173 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import maximum_flow
+
+from icarus_simulator.strategies.atk_feasibility_check.attack_lp import conformant_flow_set
+from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
+    BaseFeasStrat,
+)
+from icarus_simulator.strategies.atk_feasibility_check.highs_feas_strat import HighsFeasStrat
+from icarus_simulator.structure_definitions import (
+    Edge,
+    PathData,
+    DirectionData,
+    BwData,
+    AtkFlowSet,
+    TuplePath,
+)
+from icarus_simulator.utils import get_edges
+
+
+# Solver-free feasibility check for single targets. The directions all end on the target: if every satellite has a
+# single next hop in them, they form a tree rooted at the target, the direction flows are the edge flows of the tree,
+# and the LP of LPFeasStrat becomes a max-flow problem, solved exactly in one pass over the tree. Otherwise, the max-flow
+# of the graph of the direction edges still proves infeasibility when below the needed bw, and only the remaining
+# checks are left to the fallback strategy.
+class MaxFlowFeasStrat(BaseFeasStrat):
+    def __init__(self, fallback_strat: type = HighsFeasStrat, **kwargs):
+        super().__init__()
+        self.fallback: BaseFeasStrat = fallback_strat(**kwargs)
+
+    @property
+    def name(self) -> str:
+        return "mxf"
+
+    @property
+    def param_description(self) -> str:
+        return self.fallback.name
+
+    def open_session(self) -> None:
+        self.fallback.open_session()
+
+    def close_session(self) -> None:
+        self.fallback.close_session()
+
+    def empty_enviorment(self):
+        self.fallback.empty_enviorment()
+
+    def compute(
+        self,
+        congest_edges: List[Edge],
+        path_data: PathData,
+        bw_data: BwData,
+        direction_data: DirectionData,
+        max_uplink_increase: int,
+    ) -> Tuple[Optional[AtkFlowSet], int, int]:
+        start = time.time()
+        result = tree_max_flow(congest_edges, bw_data, direction_data, max_uplink_increase)
+        self.solve_time += time.time() - start
+        if result is not None:
+            return result
+
+        startup, solve = self.fallback.startup_time, self.fallback.solve_time
+        result = self.fallback.compute(
+            congest_edges, path_data, bw_data, direction_data, max_uplink_increase
+        )
+        self.startup_time += self.fallback.startup_time - startup
+        self.solve_time += self.fallback.solve_time - solve
+        return result
+
+
+def tree_max_flow(
+    congest_edges: List[Edge],
+    bw_data: BwData,
+    direction_data: DirectionData,
+    max_uplink_increase: int,
+) -> Optional[Tuple[Optional[AtkFlowSet], int, int]]:
+    """
+    Saturate a single target through a tree of directions, within the remaining bw of the edges, and the maximum
+    uplink increase on the uplinks. Same outputs as LPFeasStrat, or None if the LP is needed to decide.
+    """
+    if len(congest_edges) != 1 or len(direction_data) == 0:
+        return None
+    target = congest_edges[0]
+    needed = bw_data[target].get_remaining_bw()
+
+    def cap(ed: Edge) -> int:
+        if ed[0] == -1:
+            return min(bw_data[ed].get_remaining_bw(), max_uplink_increase)
+        return bw_data[ed].get_remaining_bw()
+
+    # In a tree, every direction is identified by its first satellite, and every satellite has a single next hop
+    next_hop: Dict[int, int] = {}
+    first_of: Dict[int, TuplePath] = {}
+    is_tree = True
+    for dire in direction_data:
+        if len(dire) < 2 or dire[0] != -1 or (dire[-2], dire[-1]) != target:
+            return None
+        if dire[1] in first_of:
+            is_tree = False
+        first_of[dire[1]] = dire
+        for u, v in get_edges(dire, excl_start=1):
+            if next_hop.setdefault(u, v) != v:
+                is_tree = False
+    if not is_tree or target[1] in next_hop:
+        # The flows of the directions are also flows of the graph of their edges: if its min cut is below the needed,
+        # the LP is not feasible either. Otherwise, the LP is needed to restrict the flows to the directions.
+        if graph_max_flow(target, direction_data, cap) < needed:
+            return None, -1, -1
+        return None
+
+    # An uplink target is its own single direction, bounded by the maximum uplink increase as well
+    if target[0] == -1:
+        flow = cap(target)
+        flows = {first_of[target[1]]: flow}
+    else:
+        # Bottom-up: maximum flow each satellite can send to its next hop
+        children: Dict[int, List[int]] = {}
+        for u, v in next_hop.items():
+            children.setdefault(v, []).append(u)
+        order, queue = [], deque([target[0]])
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            queue.extend(children.get(u, []))
+        uplink = {u: cap((-1, u)) for u in first_of}
+        out_max: Dict[int, int] = {}
+        for u in reversed(order):
+            inflow = uplink.get(u, 0) + sum(out_max[w] for w in children.get(u, []))
+            out_max[u] = min(cap((u, next_hop[u])), inflow)
+        if out_max[target[0]] < needed:  # Not feasible, attack not possible!
+            return None, -1, -1
+
+        # Top-down: route exactly the needed flow, from the farthest satellites first
+        demand, flows = {target[0]: needed}, {}
+        for u in order:
+            rem = demand.get(u, 0)
+            for w in children.get(u, []):
+                demand[w] = min(rem, out_max[w])
+                rem -= demand[w]
+            if u in first_of:
+                flows[first_of[u]] = min(rem, uplink[u])
+                rem -= flows[first_of[u]]
+            assert rem == 0
+
+    directions_bw = [(dire, flows[dire]) for dire in direction_data if flows.get(dire, 0) > 0]
+    detect = max((bw for _, bw in directions_bw), default=0)
+    return conformant_flow_set(directions_bw, direction_data), needed, detect
+
+
+def graph_max_flow(target: Edge, direction_data: DirectionData, cap: Callable[[Edge], int]) -> int:
+    """Maximum flow through the target in the graph of the direction edges, from all their uplinks."""
+    node_ids: Dict[int, int] = {}
+
+    def node(n: int) -> int:
+        return node_ids.setdefault(n, len(node_ids) + 2)  # 0 is the source of the uplinks, 1 the end of the target
+
+    caps: Dict[Tuple[int, int], int] = {}
+    for dire in direction_data:
+        for u, v in get_edges(dire):
+            a = 0 if u == -1 else node(u)
+            b = 1 if (u, v) == target else node(v)
+            caps[(a, b)] = max(cap((u, v)), 0)
+    rows, cols = zip(*caps.keys())
+    num_nodes = len(node_ids) + 2
+    graph = csr_matrix(
+        (np.array(list(caps.values()), dtype=np.int32), (rows, cols)), shape=(num_nodes, num_nodes)
+    )
+    return int(maximum_flow(graph, 0, 1).flow_value)
@@ -0,0 +1,45 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Per-process pool of feasibility strategies with an open solver session, for the attack workers.
+Instead of copying the strategy and starting a new solver environment for every sample, each worker process gets its
+own copy of the strategy on the first request, opens its session once, and reuses it for all its samples. Sessions
+inherited from the parent by a forked worker are never reused nor closed by it, as they belong to the parent.
+"""
+import copy
+import os
+from typing import Dict, Optional, Tuple
+
+from icarus_simulator.strategies.atk_feasibility_check.base_feas_strat import (
+    BaseFeasStrat,
+)
+
+_sessions: Dict[int, BaseFeasStrat] = {}
+_sessions_pid: Optional[int] = None
+
+
+def worker_session(feas_strat: BaseFeasStrat) -> BaseFeasStrat:
+    """The copy of feas_strat owned by the current process, with its session open."""
+    global _sessions_pid
+    if _sessions_pid != os.getpid():
+        _sessions.clear()
+        _sessions_pid = os.getpid()
+    session = _sessions.get(id(feas_strat))
+    if session is None:
+        session = copy.deepcopy(feas_strat)
+        session.empty_enviorment()  # The copied solver state is not usable
+        session.startup_time, session.solve_time = 0.0, 0.0
+        session.open_session()
+        _sessions[id(feas_strat)] = session
+    return session
+
+
+def close_worker_sessions() -> Tuple[float, float]:
+    """Close the sessions of the current process. Returns the seconds spent in their startup, and in solving."""
+    startup, solve = 0.0, 0.0
+    if _sessions_pid == os.getpid():
+        for session in _sessions.values():
+            session.close_session()
+            startup += session.startup_time
+            solve += session.solve_time
+    _sessions.clear()
+    return startup, solve
@@ -26,3 +26,7 @@ class BasePathFilteringStrat(BaseStrat):
         allowed_sources: List[int],
     ) -> DirectionData:
         raise NotImplementedError
+
+    def prepare(self, edges: List[Edge], edge_data: EdgeData, path_data: PathData) -> None:
+        """Precompute what compute needs for the edges, before the workers start. Nothing by default."""
+        return None
@@ -1,6 +1,7 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
-from typing import List
+from typing import List, Optional
 
+from icarus_simulator.direction_index import DirectionIndex
 from icarus_simulator.strategies.atk_path_filtering.base_path_filtering_strat import (
     BasePathFilteringStrat,
 )
@@ -12,7 +13,14 @@ from icarus_simulator.structure_definitions import (
 )
 
 
+# The directions through each edge are computed once, see DirectionIndex, and only read here
 class DirectionalFilteringStrat(BasePathFilteringStrat):
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.index: Optional[DirectionIndex] = None
+        if len(kwargs) > 0:
+            pass  # Appease the unused param inspection
+
     @property
     def name(self) -> str:
         return "dir"
@@ -21,6 +29,16 @@ class DirectionalFilteringStrat(BasePathFilteringStrat):
     def param_description(self) -> None:
         return None
 
+    def get_index(self, edge_data: EdgeData, path_data: PathData) -> DirectionIndex:
+        # The index of the last inputs, built again only for new ones
+        index = self.index
+        if index is None or index.edge_data is not edge_data or index.path_data is not path_data:
+            self.index = index = DirectionIndex(edge_data, path_data)
+        return index
+
+    def prepare(self, edges: List[Edge], edge_data: EdgeData, path_data: PathData) -> None:
+        self.get_index(edge_data, path_data).build(edges)
+
     def compute(
         self,
         edges: List[Edge],
@@ -28,42 +46,4 @@ class DirectionalFilteringStrat(BasePathFilteringStrat):
         path_data: PathData,
         allowed_sources: List[int],
     ) -> DirectionData:
-        direction_data = {}
-        for edge in edges:
-            inv_ed = (edge[1], edge[0])
-            idxs_in_order = edge_data[edge].paths_through
-            idxs_in_rev = edge_data[inv_ed].paths_through
-
-            # Avoid duplicate indices. It can occur that gnd-sat-gnd paths are in both lists
-            set_in_order, set_in_rev = set(idxs_in_order), set(idxs_in_rev)
-            set_in_rev.difference_update(set_in_order)
-            idxs_in_rev = list(set_in_rev)
-
-            # Extract the path in the correct order
-            idxs = idxs_in_order + idxs_in_rev
-            for i, idx in enumerate(idxs):
-                in_order = i < len(idxs_in_order)
-                base_path = path_data[(idx[0], idx[1])][idx[2]][0]
-                pair = idx[0], idx[1]
-                if not in_order:
-                    base_path = base_path[::-1]
-                    pair = idx[1], idx[0]
-                # Skip if the source is not in the allowed sources
-                if -base_path[0] not in allowed_sources:
-                    continue
-
-                # Path truncation
-                # Cut the path at the target if ed[1] != -1. In this case the whole path is kept.
-                if edge[1] != -1:
-                    last_idx = base_path.index(edge[1])
-                    truncated = tuple([-1] + base_path[1 : last_idx + 1])
-                else:
-                    truncated = tuple([-1] + base_path[1:-1] + [-1])
-
-                # Note that we are not adding ordered pairs! Sending data from a to b is different
-                # than sending from b to a, the probability of hitting the target is different!
-                if truncated not in direction_data:
-                    direction_data[truncated] = []
-                direction_data[truncated].append(pair)  # Add multiple times if needed
-
-        return direction_data
+        return self.get_index(edge_data, path_data).direction_data(edges, allowed_sources)
@@ -7,6 +7,7 @@ See BaseStrategy for more details.
 from abc import abstractmethod
 from typing import List
 
+from icarus_simulator.demand_matrix import DemandMatrix
 from icarus_simulator.strategies.base_strat import BaseStrat
 from icarus_simulator.structure_definitions import PathData, EdgeData, BwData, PathId
 
@@ -17,3 +18,9 @@ class BaseBwAssignStrat(BaseStrat):
         self, path_data: PathData, path_list: List[PathId], edge_data: EdgeData
     ) -> BwData:
         raise NotImplementedError
+
+    def compute_demands(
+        self, path_data: PathData, demands: DemandMatrix, edge_data: EdgeData
+    ) -> BwData:
+        """Assign aggregated demands, by default as their quanta grouped by path."""
+        return self.compute(path_data, demands.to_path_list(), edge_data)
@@ -1,6 +1,12 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
-from typing import List
+import numpy as np
+from typing import List, Dict
 
+from icarus_simulator.bw_table import BwTable, greedy_block_split
+from icarus_simulator.demand_matrix import DemandMatrix
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.path_incidence import hop_edge_ids
+from icarus_simulator.path_store import PathStore
 from icarus_simulator.strategies.bw_assignment.base_bw_assig_strat import (
     BaseBwAssignStrat,
 )
@@ -9,17 +15,25 @@ from icarus_simulator.structure_definitions import (
     PathData,
     EdgeData,
     PathId,
-    BwInfo,
 )
-from icarus_simulator.utils import get_edges
 
 
 class BidirBwAssignStrat(BaseBwAssignStrat):
-    def __init__(self, isl_bw: int, udl_bw: int, utilisation: float, **kwargs):
+    def __init__(
+        self,
+        isl_bw: int,
+        udl_bw: int,
+        utilisation: float,
+        block_size: int = 4096,
+        **kwargs,
+    ):
         super().__init__()
         self.isl_bw = isl_bw
         self.udl_bw = udl_bw
         self.utilisation = utilisation
+        if block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.block_size = block_size
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -34,47 +48,68 @@ class BidirBwAssignStrat(BaseBwAssignStrat):
     def compute(
         self, path_data: PathData, path_list: List[PathId], edge_data: EdgeData
     ) -> BwData:
-        allocated, dropped = 0, 0
+        # Map each quantum to its distinct path
+        path_rows: Dict[PathId, int] = {}
+        path_ids, quantum_rows = [], np.empty(len(path_list), dtype=np.int64)
+        for quantum, path_id in enumerate(path_list):
+            key = (path_id[0], path_id[1], path_id[2])
+            row = path_rows.get(key)
+            if row is None:
+                row = path_rows[key] = len(path_ids)
+                path_ids.append(key)
+            quantum_rows[quantum] = row
+        amounts = np.ones(len(path_list), dtype=np.int64)
+        return self._assign(path_data, path_ids, quantum_rows, amounts, edge_data)
+
+    def compute_demands(
+        self, path_data: PathData, demands: DemandMatrix, edge_data: EdgeData
+    ) -> BwData:
+        # The demands are on distinct paths, and are split at the saturation point of their path
+        rows = np.arange(len(demands))
+        return self._assign(path_data, demands.path_ids(), rows, demands.count, edge_data)
+
+    def _assign(
+        self,
+        path_data: PathData,
+        path_ids: List[PathId],
+        item_rows: np.ndarray,
+        amounts: np.ndarray,
+        edge_data: EdgeData,
+    ) -> BwData:
         max_updown = int(self.udl_bw * self.utilisation)
         max_isl = int(self.isl_bw * self.utilisation)
-        bw_data: BwData = {
-            ed: (BwInfo(0, self.isl_bw) if -1 not in ed else BwInfo(0, self.udl_bw))
-            for ed in edge_data
-        }
+        edge_index = EdgeIndex(list(edge_data.keys()))
+        bw_table = BwTable.from_capacities(edge_index, self.isl_bw, self.udl_bw)
 
-        # Allocate one quantum per path
-        for path_id in path_list:
-            path = path_data[(path_id[0], path_id[1])][path_id[2]][0]
-            # Convert to -1 notation
-            first, last = -path[0], -path[-1]
-            path[0], path[-1], path_fits = -1, -1, True
-            eds = list(get_edges(path))
-            # Swap last and second edges: optimisation, moved the downlink check at the beginning
-            dlink, sec = eds[-1], eds[1]
-            eds[1], eds[-1] = dlink, sec
+        # Flatten the distinct paths, and map each item to the hops of its path
+        # The paths are only read: the per-quantum loop used to write -1 at their ends and restore -path[0], flipping
+        # the sign of the gnd ends of every path assigned an odd number of quanta in the shared path_data
+        if isinstance(path_data, PathStore):
+            paths = [path_data.path((key[0], key[1]), key[2]) for key in path_ids]
+        else:
+            paths = [path_data[(key[0], key[1])][key[2]][0] for key in path_ids]
+        path_ptr = np.zeros(len(paths) + 1, dtype=np.int64)
+        path_ptr[1:] = np.cumsum([len(path) for path in paths])
+        nodes = np.fromiter(
+            (node for path in paths for node in path), dtype=np.int64, count=int(path_ptr[-1])
+        )
+        _, hop_eids = hop_edge_ids(nodes, path_ptr, edge_index)
+        # Both directions of an edge share the same link, and are always equally loaded
+        hop_links = np.minimum(hop_eids, edge_index.inverse[hop_eids])
+        path_hop_ptr = path_ptr - np.arange(len(paths) + 1)
+        num_hops = np.diff(path_hop_ptr)[item_rows]
+        hop_items = np.repeat(np.arange(len(item_rows)), num_hops)
+        first_hop = np.repeat(path_hop_ptr[item_rows] - np.cumsum(num_hops) + num_hops, num_hops)
+        item_links = hop_links[first_hop + np.arange(len(hop_items))]
 
-            # Check if the addition of this communication would fit in the involved edges
-            for ed in eds:
-                max_link = max_isl
-                if -1 in ed:
-                    max_link = max_updown
-                if (
-                    bw_data[ed].idle_bw + 1 > max_link
-                ):  # Can be equal, we have utilisation
-                    path_fits = False
-                    break
-            # If the path fits, add it to the current bandwidths
-            if path_fits:
-                allocated += 1
-                for ed in get_edges(path):
-                    inv_ed = (ed[1], ed[0])
-                    bw_data[ed].idle_bw += 1
-                    bw_data[inv_ed].idle_bw += 1
-            else:
-                dropped += 1
-            # Swap back the extremes
-            path[0], path[-1] = first, last
+        # Allocate the items in order, as much of each as fits in all its edges. Can be equal, we have utilisation
+        load = np.zeros(len(edge_index), dtype=np.int64)
+        limit = np.where(edge_index.is_updown, max_updown, max_isl)
+        granted = greedy_block_split(hop_items, item_links, amounts, load, limit, self.block_size)
+        bw_table.idle_bw[:] = load[np.minimum(np.arange(len(edge_index)), edge_index.inverse)]
+        allocated = int(granted.sum())
+        dropped = int(amounts.sum()) - allocated
 
         # Interesting data prints
         print(f"Alloc, drop, multi_drop: {allocated}, {dropped}")
-        return bw_data
+        return bw_table.view()
@@ -7,6 +7,7 @@ See BaseStrategy for more details.
 from abc import abstractmethod
 from typing import List
 
+from icarus_simulator.demand_matrix import DemandMatrix
 from icarus_simulator.strategies.base_strat import BaseStrat
 from icarus_simulator.structure_definitions import GridPos, PathData, PathId
 
@@ -15,3 +16,7 @@ class BaseBwSelectStrat(BaseStrat):
     @abstractmethod
     def compute(self, grid_pos: GridPos, path_data: PathData) -> List[PathId]:
         raise NotImplementedError
+
+    def compute_demands(self, grid_pos: GridPos, path_data: PathData) -> DemandMatrix:
+        """The chosen quanta, aggregated by path. Strategies can override this to skip building the quanta list."""
+        return DemandMatrix.from_path_ids(self.compute(grid_pos, path_data))
@@ -1,20 +1,23 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
-import random
-from typing import List
+import numpy as np
+from typing import List, Optional, Tuple
 
+from icarus_simulator.demand_matrix import DemandMatrix
 from icarus_simulator.strategies.bw_selection.base_bw_select_strat import (
     BaseBwSelectStrat,
 )
 from icarus_simulator.structure_definitions import GridPos, PathData, PathId
-from icarus_simulator.utils import get_ordered_idx
+from icarus_simulator.traffic_sampler import TrafficSampler, lbset_sizes
 
 
 # Computes a sampled traffic matrix. IMPORTANT: this strategy assumes that all paths are symmetrical, and path_data
 # only stores the ordered pairs for space and performance reasons.
 class SampledBwSelectStrat(BaseBwSelectStrat):
-    def __init__(self, sampled_quanta: int, **kwargs):
+    def __init__(self, sampled_quanta: int, seed: Optional[int] = None, **kwargs):
         super().__init__()
         self.sampled_quanta = sampled_quanta
+        self.seed = seed
+        self.sampler: Optional[TrafficSampler] = None
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -24,24 +27,27 @@ class SampledBwSelectStrat(BaseBwSelectStrat):
 
     @property
     def param_description(self) -> str:
-        return f"{self.sampled_quanta}"
+        # Unseeded runs keep the names of the existing results
+        seed = "" if self.seed is None else f"s{self.seed}"
+        return f"{self.sampled_quanta}{seed}"
 
     def compute(self, grid_pos: GridPos, path_data: PathData) -> List[PathId]:
-        # random.seed("ETHZ")
-        # Sample communication pairs
-        samples = random.choices(
-            list(grid_pos.keys()),
-            [val.weight for val in grid_pos.values()],
-            k=self.sampled_quanta * 2,
-        )
-        # If the pair exists, sample a suitable path
-        path_ids = []
-        for i in range(0, self.sampled_quanta * 2, 2):
-            ord_sample = get_ordered_idx((samples[i], samples[i + 1]))[0]
-            # If the sample is not in the paths, or there is no path between the pair, the sample is dropped
-            if ord_sample not in path_data or len(path_data[ord_sample]) == 0:
-                continue
-            lbset_size = len(path_data[ord_sample])
-            id_in_lbset = random.randrange(0, lbset_size)
-            path_ids.append((ord_sample[0], ord_sample[1], id_in_lbset))
-        return path_ids
+        src, dst, ids_in_lbset = self._sample(grid_pos, path_data)
+        return list(zip(src.tolist(), dst.tolist(), ids_in_lbset.tolist()))
+
+    def compute_demands(self, grid_pos: GridPos, path_data: PathData) -> DemandMatrix:
+        return DemandMatrix.from_arrays(*self._sample(grid_pos, path_data))
+
+    def _sample(self, grid_pos: GridPos, path_data: PathData) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.sampler is None or self.sampler.grid_pos is not grid_pos:
+            self.sampler = TrafficSampler(grid_pos, self.seed)
+        rng = self.sampler.rng
+        # Sample communication pairs, ordered numerically
+        src, dst = self.sampler.draw_pairs(self.sampled_quanta, rng)
+        src, dst = np.minimum(src, dst), np.maximum(src, dst)
+        # If the sample is not in the paths, or there is no path between the pair, the sample is dropped
+        sizes = lbset_sizes(path_data, src, dst)
+        kept = sizes > 0
+        # Sample a suitable path for the remaining pairs
+        ids_in_lbset = (rng.random(np.count_nonzero(kept)) * sizes[kept]).astype(np.int64)
+        return src[kept], dst[kept], ids_in_lbset
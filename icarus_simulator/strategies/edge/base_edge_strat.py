@@ -5,10 +5,19 @@ This class is open for custom extension, in order to create different execution
 See BaseStrategy for more details.
 """
 from abc import abstractmethod
-from typing import Dict
+from typing import Dict, Optional
 
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.path_store import PathStore
 from icarus_simulator.strategies.base_strat import BaseStrat
-from icarus_simulator.structure_definitions import Edge, TempEdgeInfo, Path, PathId
+from icarus_simulator.structure_definitions import (
+    Edge,
+    TempEdgeInfo,
+    Path,
+    PathId,
+    EdgeData,
+    GridPos,
+)
 
 
 class BaseEdgeStrat(BaseStrat):
@@ -17,3 +26,9 @@ class BaseEdgeStrat(BaseStrat):
         self, temp_edge_data: Dict[Edge, TempEdgeInfo], path: Path, path_id: PathId
     ) -> None:
         raise NotImplementedError
+
+    def compute_all(
+        self, store: PathStore, edge_index: EdgeIndex, grid_pos: GridPos
+    ) -> Optional[EdgeData]:
+        # Optional vectorised computation over all the paths at once. None falls back to compute() on every path
+        return None
@@ -1,8 +1,21 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
-from typing import Dict
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import Dict, Optional
 
+from icarus_simulator.edge_index import EdgeIndex
+from icarus_simulator.path_incidence import PathIncidence, PathsThrough
+from icarus_simulator.path_store import PathStore
 from icarus_simulator.strategies.edge.base_edge_strat import BaseEdgeStrat
-from icarus_simulator.structure_definitions import Path, PathId, Edge, TempEdgeInfo
+from icarus_simulator.structure_definitions import (
+    Path,
+    PathId,
+    Edge,
+    TempEdgeInfo,
+    EdgeData,
+    EdgeInfo,
+    GridPos,
+)
 from icarus_simulator.utils import get_edges
 
 
@@ -41,3 +54,37 @@ class BidirEdgeStrat(BaseEdgeStrat):
             temp_edge_data[inv_ed].source_gridpoints.add(last)
         # Restore the path first and last (gnd) hops
         path[0], path[-1] = -first, -last
+
+    def compute_all(
+        self, store: PathStore, edge_index: EdgeIndex, grid_pos: GridPos
+    ) -> Optional[EdgeData]:
+        incidence = PathIncidence(store, edge_index)
+        # A path through an edge also counts for the inverse edge
+        counts = incidence.edge_counts()
+        centrality = (counts + counts[edge_index.inverse]) / max(incidence.num_paths, 1)
+
+        # Source gridpoints: the first gnd of the paths through the edge, and the last gnd of those through the inverse
+        grid_ids = list(grid_pos.keys())
+        grid_col = {gnd: col for col, gnd in enumerate(grid_ids)}
+        first_col = np.array([grid_col[gnd] for gnd in incidence.path_first.tolist()], dtype=np.int64)
+        last_col = np.array([grid_col[gnd] for gnd in incidence.path_last.tolist()], dtype=np.int64)
+        shape = (incidence.num_paths, len(grid_ids))
+        ones = np.ones(incidence.num_paths, dtype=np.int32)
+        to_first = csr_matrix((ones, (np.arange(incidence.num_paths), first_col)), shape=shape)
+        to_last = csr_matrix((ones, (np.arange(incidence.num_paths), last_col)), shape=shape)
+        edge_gnds = (incidence.csc.T @ to_first) + (incidence.csc.T @ to_last)[edge_index.inverse]
+        edge_gnds.data[:] = 1  # Each gridpoint counts once
+        surfaces = np.array([grid_pos[gnd].surface for gnd in grid_ids], dtype=np.float64)
+        cov_centr = edge_gnds @ surfaces
+
+        edge_data: EdgeData = {}
+        for edge_id, ed in enumerate(edge_index.edges):
+            if centrality[edge_id] > 0:
+                edge_data[ed] = EdgeInfo(
+                    PathsThrough(incidence, edge_id),
+                    float(centrality[edge_id]),
+                    float(cov_centr[edge_id]),
+                )
+            else:  # Edge is never touched by the data, add default
+                edge_data[ed] = EdgeInfo([], 0.0, 0.0)
+        return edge_data
@@ -22,6 +22,7 @@ class ManhLSNStrat(BaseLSNStrat):
         secs: int,
         millis: int,
         epoch: str,
+        propagator: str = "ephem",
         **kwargs,
     ):
         super().__init__()
@@ -35,6 +36,7 @@ class ManhLSNStrat(BaseLSNStrat):
         self.secs = secs
         self.millis = millis
         self.epoch = epoch
+        self.propagator = propagator
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -44,12 +46,15 @@ class ManhLSNStrat(BaseLSNStrat):
 
     @property
     def param_description(self) -> str:
+        # The default propagator is left out, to keep the names of the existing results
+        propagator = "" if self.propagator == "ephem" else self.propagator
         return (
             f"{self.inclination}°{self.sats_per_orbit}x{self.orbits}f{self.f}"
             f"e{int(self.elevation//1000)}km"
             f"{str(self.hrs).zfill(2)}h{str(self.mins).zfill(2)}m{str(self.secs).zfill(2)}s"
             f"{str(self.millis).zfill(4)}ms"
             f"{str(self.epoch).replace(' ' , '').replace(':', '').replace('/', '')}"
+            f"{propagator}"
         )
 
     def compute(self) -> Tuple[SatPos, nx.Graph, List[IslInfo]]:
@@ -60,6 +65,7 @@ class ManhLSNStrat(BaseLSNStrat):
             self.epoch,
             self.f,
             elevation=self.elevation,
+            propagator=self.propagator,
         )
         walker.compute_network_at_epoch_offset(self.hrs, self.mins, self.secs)
         sat_pos = {
@@ -1,3 +1,4 @@
+from .bsp_rout_strat import BSPRoutStrat
 from .kdg_rout_strat import KDGRoutStrat
 from .kds_rout_strat import KDSRoutStrat
 from .klo_rout_strat import KLORoutStrat
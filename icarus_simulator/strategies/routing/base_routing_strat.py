@@ -6,15 +6,53 @@ See BaseStrategy for more details.
 """
 import networkx as nx
 
+from typing import Sequence
+
 from abc import abstractmethod
 
+from icarus_simulator.sat_core.routing_graph import SEARCH_METHODS
 from icarus_simulator.strategies.base_strat import BaseStrat
-from icarus_simulator.structure_definitions import GridPos, SdPair, Coverage, LbSet
+from icarus_simulator.structure_definitions import (
+    GridPos,
+    SdPair,
+    Coverage,
+    LbSet,
+    PathData,
+)
 
 
 class BaseRoutingStrat(BaseStrat):
+    def _set_search(self, search: str) -> None:
+        """Set the shortest path search of the strategy, one of SEARCH_METHODS."""
+        if search not in SEARCH_METHODS:
+            raise ValueError(f"Unknown search method {search}, choose one of {SEARCH_METHODS}")
+        self.search = search
+
+    @property
+    def _search_tag(self) -> str:
+        # The default search is left out of param_description, to keep the names of the existing results
+        return "" if self.search == "dijkstra" else self.search
+
+    def prepare(self, grid: GridPos, network: nx.Graph, coverage: Coverage) -> None:
+        """Optional precomputation, run once on the phase inputs before the pairs are distributed to the workers."""
+        return
+
     @abstractmethod
     def compute(
         self, pair: SdPair, grid: GridPos, network: nx.Graph, coverage: Coverage
     ) -> LbSet:
         raise NotImplementedError
+
+    def compute_source(
+        self,
+        src: int,
+        dsts: Sequence[int],
+        grid: GridPos,
+        network: nx.Graph,
+        coverage: Coverage,
+    ) -> PathData:
+        """
+        Compute the paths from one source to many destinations, used by the source-grouped routing mode.
+        Override this when a single search from the source can serve all the destinations.
+        """
+        return {(src, dst): self.compute((src, dst), grid, network, coverage) for dst in dsts}
@@ -0,0 +1,85 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+from typing import Optional
+
+import networkx as nx
+from geopy.distance import great_circle
+
+from icarus_simulator.sat_core.backbone import SatBackbone
+from icarus_simulator.strategies.routing.base_routing_strat import BaseRoutingStrat
+from icarus_simulator.structure_definitions import (
+    GridPos,
+    SdPair,
+    Coverage,
+    LbSet,
+    PathInfo,
+)
+from icarus_simulator.utils import get_edges, get_edge_length
+
+
+class BSPRoutStrat(BaseRoutingStrat):
+    """
+    Same single shortest path as SSPRoutStrat, read from the all-pairs satellite backbone instead of running a
+    Dijkstra search on the network for every pair.
+    If backbone_dir is given, the backbone is saved there in prepare(), and pickled copies of the strategy load it
+    memory-mapped instead of carrying the matrices.
+    """
+
+    def __init__(
+        self, desirability_stretch: float, backbone_dir: Optional[str] = None, **kwargs
+    ):
+        super().__init__()
+        self.desirability_stretch = desirability_stretch
+        self.backbone_dir = backbone_dir
+        self.backbone: Optional[SatBackbone] = None
+        if len(kwargs) > 0:
+            pass  # Appease the unused param inspection
+
+    @property
+    def name(self) -> str:
+        return "bsp"
+
+    @property
+    def param_description(self) -> str:
+        return f"{self.desirability_stretch}"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.backbone_dir is not None:
+            state["backbone"] = None
+        return state
+
+    def prepare(self, grid: GridPos, network: nx.Graph, coverage: Coverage) -> None:
+        self.backbone = SatBackbone.from_network(network)
+        if self.backbone_dir is not None:
+            self.backbone.save(self.backbone_dir)
+
+    def compute(
+        self, pair: SdPair, grid: GridPos, network: nx.Graph, coverage: Coverage
+    ) -> LbSet:
+        if self.backbone is None:
+            if self.backbone_dir is not None:
+                self.backbone = SatBackbone.load(self.backbone_dir)
+            else:
+                self.prepare(grid, network, coverage)
+        in_grid, out_grid = pair[0], pair[1]
+        fiber_len = (
+            great_circle(
+                (grid[in_grid].lat, grid[in_grid].lon),
+                (grid[out_grid].lat, grid[out_grid].lon),
+            ).meters
+            * self.desirability_stretch
+        )
+
+        lbset: LbSet = []
+        sat_path = self.backbone.best_ground_route(coverage[in_grid], coverage[out_grid])
+        if sat_path is None:
+            return lbset
+        # Sum the exact lengths in path order, the backbone distances are only float32
+        length = coverage[in_grid][sat_path[0]]
+        for ed in get_edges(sat_path):
+            length += get_edge_length(network, ed)
+        length += coverage[out_grid][sat_path[-1]]
+        if length <= fiber_len:
+            pi: PathInfo = ([-in_grid] + sat_path + [-out_grid], length)
+            lbset.append(pi)
+        return lbset
@@ -2,15 +2,22 @@
 import networkx as nx
 from geopy.distance import great_circle
 
+from icarus_simulator.sat_core.routing_graph import (
+    GroundOverlay,
+    shortest_path,
+)
 from icarus_simulator.strategies.routing.base_routing_strat import BaseRoutingStrat
 from icarus_simulator.structure_definitions import GridPos, SdPair, Coverage, LbSet
 
 
 class KDSRoutStrat(BaseRoutingStrat):
-    def __init__(self, desirability_stretch: float, k: int, **kwargs):
+    def __init__(
+        self, desirability_stretch: float, k: int, search: str = "dijkstra", **kwargs
+    ):
         super().__init__()
         self.desirability_stretch = desirability_stretch
         self.k = k
+        self._set_search(search)
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -20,7 +27,7 @@ class KDSRoutStrat(BaseRoutingStrat):
 
     @property
     def param_description(self) -> str:
-        return f"{self.desirability_stretch}k{self.k}"
+        return f"{self.desirability_stretch}k{self.k}{self._search_tag}"
 
     def compute(
         self, pair: SdPair, grid: GridPos, network: nx.Graph, coverage: Coverage
@@ -33,19 +40,20 @@ class KDSRoutStrat(BaseRoutingStrat):
             ).meters
             * self.desirability_stretch
         )
-        # Add the gnd nodes
-        for gnd in pair:
-            for dst_sat in coverage[gnd]:
-                network.add_edge(-gnd, dst_sat, length=coverage[gnd][dst_sat])
+        # Overlay the gnd nodes
+        overlay = GroundOverlay(
+            network,
+            {-gnd: coverage[gnd] for gnd in pair},
+            {-gnd: grid[gnd].to_geo_pos() for gnd in pair},
+        )
 
         # Compute the possible paths using the chosen criterion
         lbset: LbSet = []
-        lengths = {}
         cnt = 0
         while True:
             try:
-                length, path = nx.single_source_dijkstra(
-                    network, -pair[0], -pair[1], cutoff=fiber_len, weight="length"
+                length, path = shortest_path(
+                    overlay, -pair[0], -pair[1], fiber_len, self.search
                 )
             except nx.NetworkXNoPath:
                 break
@@ -58,22 +66,12 @@ class KDSRoutStrat(BaseRoutingStrat):
             if len(path) <= 3:
                 break
             # Set used edges to INF length, and also the ones coming out of the nodes
-            ed = path[1], path[2]
-            lengths[ed] = network[ed[0]][ed[1]]["length"]
-            network[ed[0]][ed[1]]["length"] = float("inf")
+            overlay.mask_edge(path[1], path[2])
             for n in path[2:-2]:
-                out_ed = network.edges(n)
+                out_ed = list(overlay.edges(n))
                 for ed in out_ed:
                     # Exclude up and downlinks from the disjointness
-                    if ed not in lengths and (ed[1], ed[0]) not in lengths:
-                        lengths[ed] = network[ed[0]][ed[1]]["length"]
-                        network[ed[0]][ed[1]]["length"] = float("inf")
-
-        # Restore the infinite lengths
-        for ed in lengths:
-            network[ed[0]][ed[1]]["length"] = lengths[ed]
+                    if not overlay.is_masked(ed[0], ed[1]):
+                        overlay.mask_edge(ed[0], ed[1])
 
-        # Delete the added nodes
-        for gnd in pair:
-            network.remove_node(-gnd)
         return lbset
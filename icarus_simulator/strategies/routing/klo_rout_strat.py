@@ -3,7 +3,13 @@ import networkx as nx
 
 from heapq import heapify, heappop
 from geopy.distance import great_circle
+from typing import Optional
 
+from icarus_simulator.sat_core.esx import EsxEngine
+from icarus_simulator.sat_core.routing_graph import (
+    GroundOverlay,
+    shortest_path,
+)
 from icarus_simulator.strategies.routing.base_routing_strat import BaseRoutingStrat
 from icarus_simulator.structure_definitions import GridPos, SdPair, Coverage, LbSet
 from icarus_simulator.utils import (
@@ -15,11 +21,27 @@ from icarus_simulator.utils import (
 
 
 class KLORoutStrat(BaseRoutingStrat):
-    def __init__(self, desirability_stretch: float, k: int, esx_theta: float, **kwargs):
+    def __init__(
+        self,
+        desirability_stretch: float,
+        k: int,
+        esx_theta: float,
+        search: str = "dijkstra",
+        esx_engine: str = "csr",
+        **kwargs,
+    ):
         super().__init__()
         self.desirability_stretch = desirability_stretch
         self.k = k
         self.esx_theta = esx_theta
+        self._set_search(search)
+        if esx_engine not in ("csr", "networkx"):
+            raise ValueError("esx_engine must be 'csr' or 'networkx'")
+        if esx_engine == "csr" and search != "dijkstra":
+            # The csr engine has its own A* searches, another search would only change the result names
+            raise ValueError("search is only used by the networkx esx_engine")
+        self.esx_engine = esx_engine
+        self.engine: Optional[EsxEngine] = None
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -29,7 +51,11 @@ class KLORoutStrat(BaseRoutingStrat):
 
     @property
     def param_description(self) -> str:
-        return f"{self.desirability_stretch}k{self.k}th{self.esx_theta}"
+        return f"{self.desirability_stretch}k{self.k}th{self.esx_theta}{self._search_tag}"
+
+    def prepare(self, grid: GridPos, network: nx.Graph, coverage: Coverage) -> None:
+        if self.esx_engine == "csr":
+            self.engine = EsxEngine(network)
 
     def compute(
         self, pair: SdPair, grid: GridPos, network: nx.Graph, coverage: Coverage
@@ -42,23 +68,33 @@ class KLORoutStrat(BaseRoutingStrat):
             ).meters
             * self.desirability_stretch
         )
+        if self.esx_engine == "csr":
+            # Incremental ESX on the integer-indexed network, whose searches are always A*
+            if self.engine is None or self.engine.network is not network:
+                self.prepare(grid, network, coverage)
+            paths = self.engine.esx(
+                coverage[in_grid], coverage[out_grid], self.k, self.esx_theta, fiber_len
+            )
+            return [([-in_grid] + sats + [-out_grid], length) for sats, length in paths]
 
-        # Add the gnd nodes
-        for gnd in pair:
-            for dst_sat in coverage[gnd]:
-                network.add_edge(-gnd, dst_sat, length=coverage[gnd][dst_sat])
+        # Overlay the gnd nodes
+        overlay = GroundOverlay(
+            network,
+            {-gnd: coverage[gnd] for gnd in pair},
+            {-gnd: grid[gnd].to_geo_pos() for gnd in pair},
+        )
 
         # Run the ESX algorithm. Find the shortest path first
         try:
-            length, path = nx.single_source_dijkstra(
-                network, -pair[0], -pair[1], cutoff=fiber_len, weight="length"
+            length, path = shortest_path(
+                overlay, -pair[0], -pair[1], fiber_len, self.search
             )
             chosen_paths = [
                 {
                     "path": path,
                     "length": length,
                     "heap": [
-                        (get_edge_length(network, ed), ed) for ed in get_edges(path)
+                        (get_edge_length(overlay, ed), ed) for ed in get_edges(path)
                     ][1:-1],
                 }
             ]
@@ -68,7 +104,7 @@ class KLORoutStrat(BaseRoutingStrat):
             chosen_paths = []
             p_c = None
 
-        excluded_eds, lengths = set(), {}
+        excluded_eds = set()
         while len(chosen_paths) < self.k and any(
             len(ch["heap"]) > 0 for ch in chosen_paths
         ):
@@ -76,7 +112,7 @@ class KLORoutStrat(BaseRoutingStrat):
             sim_values = [
                 (
                     similarity(
-                        p_c["path"], ch["path"], p_c["length"], ch["length"], network
+                        p_c["path"], ch["path"], p_c["length"], ch["length"], overlay
                     ),
                     len(ch["heap"]),
                     idx,
@@ -85,7 +121,7 @@ class KLORoutStrat(BaseRoutingStrat):
             ]
             if all(sv[0] <= self.esx_theta for sv in sim_values):
                 p_c["heap"] = [
-                    (get_edge_length(network, ed), ed) for ed in get_edges(p_c["path"])
+                    (get_edge_length(overlay, ed), ed) for ed in get_edges(p_c["path"])
                 ][1:-1]
                 heapify(p_c["heap"])
                 chosen_paths.append(p_c)
@@ -101,35 +137,27 @@ class KLORoutStrat(BaseRoutingStrat):
 
             top_ed = heappop(most_similar["heap"])[1]
             ord_top = get_ordered_idx(top_ed)[0]
-            if ord_top in excluded_eds or ord_top in lengths:
+            if ord_top in excluded_eds or overlay.is_masked(*ord_top):
                 continue
-            lengths[ord_top] = get_edge_length(network, top_ed)
-            network[top_ed[0]][top_ed[1]]["length"] = float("inf")
+            overlay.mask_edge(*top_ed)
 
             # Get the shortest path available. Optimisations are put into place:
-            # * This code uses setting to float("inf") instead of deleting edges, much faster
+            # * This code masks edges to float("inf") in the overlay instead of deleting them, much faster
             # * Heuristically, the dijkstra call can be done with the cutoff set to fiber_length: it is much easier for
             #   a call to fail bc the path is too long rather than bc the graph is disconnected in this setting
             # * Cutoff reduces runtime considerably in case of no convenient available
             # * If that fails, check for disconnection with BFS
             try:
-                length, path = nx.single_source_dijkstra(
-                    network, -pair[0], -pair[1], cutoff=fiber_len, weight="length"
+                length, path = shortest_path(
+                    overlay, -pair[0], -pair[1], fiber_len, self.search
                 )
                 p_c = {"path": path, "length": length}
             except nx.NetworkXNoPath:
-                cc = nx.node_connected_component(network, -pair[0])
+                cc = nx.node_connected_component(overlay, -pair[0])
                 if -pair[1] in cc:
                     # Connected: current path is too long and so will be the future ones
                     break
                 # Disconnected: this edge must not be removed, or disconnection. Revert.
-                network[top_ed[0]][top_ed[1]]["length"] = lengths[ord_top]
-                del lengths[ord_top]
+                overlay.unmask_edge(*top_ed)
                 excluded_eds.add(ord_top)
-
-        # Rebuild the original network, then delete the added nodes
-        for ed in lengths:
-            network[ed[0]][ed[1]]["length"] = lengths[ed]
-        for gnd in pair:
-            network.remove_node(-gnd)
         return [(ch["path"], ch["length"]) for ch in chosen_paths]
@@ -1,16 +1,25 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
 import networkx as nx
 from geopy.distance import great_circle
+from typing import Optional
 
+from icarus_simulator.sat_core.ksp import KspEngine
+from icarus_simulator.sat_core.routing_graph import GroundOverlay
 from icarus_simulator.strategies.routing.base_routing_strat import BaseRoutingStrat
 from icarus_simulator.structure_definitions import GridPos, SdPair, Coverage, LbSet
 
 
 class KSPRoutStrat(BaseRoutingStrat):
-    def __init__(self, desirability_stretch: float, k: int, **kwargs):
+    def __init__(
+        self, desirability_stretch: float, k: int, ksp_engine: str = "csr", **kwargs
+    ):
         super().__init__()
         self.desirability_stretch = desirability_stretch
         self.k = k
+        if ksp_engine not in ("csr", "networkx"):
+            raise ValueError("ksp_engine must be 'csr' or 'networkx'")
+        self.ksp_engine = ksp_engine
+        self.engine: Optional[KspEngine] = None
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -22,6 +31,10 @@ class KSPRoutStrat(BaseRoutingStrat):
     def param_description(self) -> str:
         return f"{self.desirability_stretch}k{self.k}"
 
+    def prepare(self, grid: GridPos, network: nx.Graph, coverage: Coverage) -> None:
+        if self.ksp_engine == "csr":
+            self.engine = KspEngine(network)
+
     def compute(
         self, pair: SdPair, grid: GridPos, network: nx.Graph, coverage: Coverage
     ) -> LbSet:
@@ -33,26 +46,29 @@ class KSPRoutStrat(BaseRoutingStrat):
             ).meters
             * self.desirability_stretch
         )
-        # Add the gnd nodes
-        for gnd in pair:
-            for dst_sat in coverage[gnd]:
-                network.add_edge(-gnd, dst_sat, length=coverage[gnd][dst_sat])
+        if self.ksp_engine == "csr":
+            if self.engine is None or self.engine.network is not network:
+                self.prepare(grid, network, coverage)
+            paths = self.engine.k_shortest_paths(
+                coverage[in_grid], coverage[out_grid], self.k, fiber_len
+            )
+            return [([-in_grid] + sats + [-out_grid], length) for sats, length in paths]
+
+        # Overlay the gnd nodes
+        overlay = GroundOverlay(network, {-gnd: coverage[gnd] for gnd in pair})
 
         # Compute the first n shortest paths
         lbset: LbSet = []
         cnt = 0
-        gen = nx.shortest_simple_paths(network, -pair[0], -pair[1], weight="length")
+        gen = nx.shortest_simple_paths(overlay, -pair[0], -pair[1], weight="length")
         for path in gen:
             path_length = 0.0
             for i in range(len(path) - 1):
-                path_length += network[path[i]][path[i + 1]]["length"]
+                path_length += overlay[path[i]][path[i + 1]]["length"]
             if path_length > fiber_len:
                 break
             lbset.append((path, path_length))
             cnt += 1
             if cnt >= self.k:
                 break
-        # Remove the added nodes
-        for gnd in pair:
-            network.remove_node(-gnd)
         return lbset
@@ -1,7 +1,12 @@
 #  2020 Tommaso Ciussani and Giacomo Giuliari
 import networkx as nx
 from geopy.distance import great_circle
+from typing import Sequence
 
+from icarus_simulator.sat_core.routing_graph import (
+    GroundOverlay,
+    shortest_path,
+)
 from icarus_simulator.strategies.routing.base_routing_strat import BaseRoutingStrat
 from icarus_simulator.structure_definitions import (
     GridPos,
@@ -9,13 +14,15 @@ from icarus_simulator.structure_definitions import (
     Coverage,
     LbSet,
     PathInfo,
+    PathData,
 )
 
 
 class SSPRoutStrat(BaseRoutingStrat):
-    def __init__(self, desirability_stretch: float, **kwargs):
+    def __init__(self, desirability_stretch: float, search: str = "dijkstra", **kwargs):
         super().__init__()
         self.desirability_stretch = desirability_stretch
+        self._set_search(search)
         if len(kwargs) > 0:
             pass  # Appease the unused param inspection
 
@@ -25,7 +32,7 @@ class SSPRoutStrat(BaseRoutingStrat):
 
     @property
     def param_description(self) -> str:
-        return f"{self.desirability_stretch}"
+        return f"{self.desirability_stretch}{self._search_tag}"
 
     def compute(
         self, pair: SdPair, grid: GridPos, network: nx.Graph, coverage: Coverage
@@ -38,23 +45,56 @@ class SSPRoutStrat(BaseRoutingStrat):
             ).meters
             * self.desirability_stretch
         )
-        # Add the gnd nodes to the network, flipping the sign
-        for gnd in pair:
-            for dst_sat in coverage[gnd]:
-                network.add_edge(-gnd, dst_sat, length=coverage[gnd][dst_sat])
+        # Overlay the gnd nodes on the network, flipping the sign
+        overlay = GroundOverlay(
+            network,
+            {-gnd: coverage[gnd] for gnd in pair},
+            {-gnd: grid[gnd].to_geo_pos() for gnd in pair},
+        )
 
         # Compute the shortest path
         lbset: LbSet = []
         try:
-            length, path = nx.single_source_dijkstra(
-                network, -pair[0], -pair[1], cutoff=fiber_len, weight="length"
+            length, path = shortest_path(
+                overlay, -pair[0], -pair[1], fiber_len, self.search
             )
             pi: PathInfo = (path, length)
             lbset.append(pi)
         except nx.NetworkXNoPath:
             pass
-
-        # Remove the added nodes
-        for gnd in pair:
-            network.remove_node(-gnd)
         return lbset
+
+    def compute_source(
+        self,
+        src: int,
+        dsts: Sequence[int],
+        grid: GridPos,
+        network: nx.Graph,
+        coverage: Coverage,
+    ) -> PathData:
+        fiber_lens = {
+            dst: great_circle(
+                (grid[src].lat, grid[src].lon), (grid[dst].lat, grid[dst].lon)
+            ).meters
+            * self.desirability_stretch
+            for dst in dsts
+        }
+        # Only the source is added: the destinations are attached to the tree afterwards, so that no path can use
+        # another ground node as a relay
+        overlay = GroundOverlay(network, {-src: coverage[src]})
+        sat_dists, sat_paths = nx.single_source_dijkstra(
+            overlay, -src, cutoff=max(fiber_lens.values(), default=0.0), weight="length"
+        )
+
+        path_data: PathData = {}
+        for dst in dsts:
+            lbset: LbSet = []
+            best_sat, best_len = None, float("inf")
+            for sat, down_len in coverage[dst].items():
+                if sat in sat_dists and sat_dists[sat] + down_len < best_len:
+                    best_sat, best_len = sat, sat_dists[sat] + down_len
+            if best_sat is not None and best_len <= fiber_lens[dst]:
+                pi: PathInfo = (sat_paths[best_sat] + [-dst], best_len)
+                lbset.append(pi)
+            path_data[(src, dst)] = lbset
+        return path_data
@@ -0,0 +1,97 @@
+#  2020 Tommaso Ciussani and Giacomo Giuliari
+"""
+Weighted sampling of communication pairs, shared by the traffic selection strategies.
+An alias table over the gridpoint weights is built once per GridPos, after which every draw costs O(1). Pairs, path
+indices and data amounts are drawn in NumPy batches from a numpy Generator. With an explicit seed, the Generator is
+created once and the draws are reproducible. Without one, a Generator is seeded from the random module at every call,
+so that the draws follow its seeding, e.g. the per-process one of Multiprocessor.
+"""
+import random
+from typing import Optional, Tuple
+
+import numpy as np
+
+from icarus_simulator.path_store import PathStore
+from icarus_simulator.structure_definitions import GridPos, PathData
+
+
+class TrafficSampler:
+    def __init__(self, grid_pos: GridPos, seed: Optional[int] = None) -> None:
+        self.grid_pos = grid_pos
+        self.keys = np.array(list(grid_pos.keys()), dtype=np.int64)
+        self.weights = np.array([val.weight for val in grid_pos.values()], dtype=np.float64)
+        self.prob, self.alias = _alias_table(self.weights)
+        self._key_order = np.argsort(self.keys)
+        self.seed = seed
+        self._rng = np.random.default_rng(seed) if seed is not None else None
+
+    @property
+    def rng(self) -> np.random.Generator:
+        if self._rng is not None:
+            return self._rng
+        return np.random.default_rng(random.getrandbits(64))
+
+    def draw(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Positions in the grid of size gridpoints, drawn with replacement proportionally to the weights."""
+        cols = rng.integers(0, len(self.prob), size=size)
+        keep = rng.random(size) < self.prob[cols]
+        return np.where(keep, cols, self.alias[cols])
+
+    def draw_pairs(
+        self, size: int, rng: np.random.Generator, distinct: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw size (src, dst) gridpoint pairs. If distinct, the dst of a pair equal to its src is drawn again until they
+        differ, which is the same as drawing it among the other gridpoints, with the same weights.
+        """
+        src, dst = self.draw(size, rng), self.draw(size, rng)
+        if distinct:
+            if np.count_nonzero(self.weights > 0) < 2:
+                raise ValueError("At least two gridpoints with positive weight are needed for distinct pairs")
+            same = np.flatnonzero(src == dst)
+            while len(same) > 0:
+                dst[same] = self.draw(len(same), rng)
+                same = same[src[same] == dst[same]]
+        return self.keys[src], self.keys[dst]
+
+    def weights_of(self, gnds: np.ndarray) -> np.ndarray:
+        """Weights of the given gridpoint keys."""
+        sorted_pos = np.searchsorted(self.keys[self._key_order], gnds)
+        return self.weights[self._key_order[sorted_pos]]
+
+
+def _alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Vose's alias method: column i keeps i with probability prob[i], alias[i] otherwise
+    num = len(weights)
+    if num == 0 or weights.sum() <= 0:
+        raise ValueError("The gridpoint weights must have a positive sum")
+    scaled = weights * num / weights.sum()
+    prob, alias = np.ones(num), np.arange(num)
+    small = [i for i in range(num) if scaled[i] < 1.0]
+    large = [i for i in range(num) if scaled[i] >= 1.0]
+    scaled = scaled.tolist()
+    while small and large:
+        low, high = small.pop(), large.pop()
+        prob[low], alias[low] = scaled[low], high
+        scaled[high] -= 1.0 - scaled[low]
+        if scaled[high] < 1.0:
+            small.append(high)
+        else:
+            large.append(high)
+    return prob, alias
+
+
+def lbset_sizes(path_data: PathData, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Number of paths of every pair, ordered numerically before the lookup. Missing pairs have 0 paths."""
+    low, high = np.minimum(src, dst), np.maximum(src, dst)
+    if isinstance(path_data, PathStore):
+        keys, pair_ptr = np.asarray(path_data.pair_keys), np.asarray(path_data.pair_ptr)
+        if len(keys) == 0:
+            return np.zeros(len(low), dtype=np.int64)
+        pair_keys = (low << 32) + high
+        idx = np.minimum(np.searchsorted(keys, pair_keys), len(keys) - 1)
+        return np.where(keys[idx] == pair_keys, pair_ptr[idx + 1] - pair_ptr[idx], 0)
+    return np.array(
+        [len(path_data.get((s, d), ())) for s, d in zip(low.tolist(), high.tolist())],
+        dtype=np.int64,
+    )
@@ -3,7 +3,7 @@
 File containing utility functions
 """
 import math
-from typing import Tuple, List
+from typing import Any, Callable, Optional, Tuple, List
 
 
 def get_ordered_idx(idx: Tuple[int, int]):
@@ -45,3 +45,31 @@ def compute_intervals_uniform(length: int, cpus: int) -> List[Tuple[int, int]]:
         itvls.append((s, e))
     itvls.append((prev_e, length))
     return itvls
+
+
+class LastValueCache:
+    """
+    Single-entry cache of the value built from some input objects, built again only when called with other inputs.
+    By default, the inputs are the same if they are the same objects, which the cache keeps until cleared. A
+    matches(value, *inputs) function can replace this check, then the inputs are not kept.
+    """
+
+    def __init__(self, build: Callable[..., Any], matches: Optional[Callable[..., bool]] = None) -> None:
+        self.build = build
+        self.matches = matches
+        self.inputs: Optional[Tuple] = None
+        self.value: Any = None
+
+    def get(self, *inputs) -> Any:
+        if self.value is None or not self._same(inputs):
+            self.value = self.build(*inputs)
+            self.inputs = inputs if self.matches is None else None
+        return self.value
+
+    def _same(self, inputs: Tuple) -> bool:
+        if self.matches is not None:
+            return self.matches(self.value, *inputs)
+        return len(inputs) == len(self.inputs) and all(a is b for a, b in zip(inputs, self.inputs))
+
+    def clear(self) -> None:
+        self.inputs, self.value = None, None